@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'task')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+from .sqlite import configure_connection
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        connection_created.connect(configure_connection)
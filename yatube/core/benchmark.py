@@ -0,0 +1,103 @@
+"""Общие инструменты бенчмарков: замеры, перцентили, отчёты в JSON."""
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, share):
+    """Перцентиль с линейной интерполяцией, share от 0 до 1."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * share
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = position - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+def summarize(latencies):
+    """Сводка по задержкам в миллисекундах."""
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        'runs': len(milliseconds),
+        'mean_ms': round(sum(milliseconds) / len(milliseconds), 3),
+        'p50_ms': round(percentile(milliseconds, 0.5), 3),
+        'p99_ms': round(percentile(milliseconds, 0.99), 3),
+    }
+
+
+def measure(func, runs, warmup=1, allocation_runs=3):
+    """Гоняет func и возвращает задержки, запросы и выделения памяти.
+
+    Память считается отдельными прогонами: tracemalloc заметно
+    замедляет код и исказил бы задержки.
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    queries = []
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(captured))
+    allocated = []
+    for _ in range(allocation_runs):
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocated.append(peak)
+    result = summarize(latencies)
+    result['queries'] = max(queries)
+    result['peak_alloc_kib'] = round(max(allocated) / 1024, 1)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, **meta):
+    """Отчёт с результатами и сведениями об окружении."""
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            **meta,
+        },
+        'results': results,
+    }
+
+
+def write_report(data, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def compare(baseline, current, field='p50_ms', tolerance=0.1):
+    """Результаты, ухудшившиеся относительно baseline больше tolerance."""
+    regressions = {}
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name, {}).get(field)
+        if before and result[field] > before * (1 + tolerance):
+            regressions[name] = (before, result[field])
+    return regressions
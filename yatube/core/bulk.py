@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def preserve_auto_now(*models):
+    """Даёт bulk_create записать свои значения в поля auto_now_add.
+
+    Меняет поля моделей на время блока, поэтому годится только для
+    однопоточных команд, а не для кода, работающего в запросах.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -0,0 +1,340 @@
+"""Кэш, общий для всех процессов одного сервера.
+
+Записи лежат в файле SQLite в /dev/shm: база открыта в режиме WAL и
+читается через mmap, поэтому воркеры gunicorn делят одну копию кэша
+без отдельного сервера. При превышении MAX_SIZE байт или MAX_ENTRIES
+записей вытесняются давно не читавшиеся ключи (LRU). Объём и число
+записей поддерживаются триггерами, попадания и промахи процессы
+сбрасывают в общую таблицу пачками.
+
+Значения хранятся в pickle, поэтому файл должен быть доступен только
+процессам сайта: по умолчанию он лежит в каталоге yatube-<uid> с
+правами 0700, а файл и каталог чужого пользователя или каталог,
+открытый на запись другим, бэкенд открыть откажется.
+"""
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+SHARED_MEMORY = '/dev/shm'
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+# Время последнего чтения обновляется не чаще раза в секунду, чтобы
+# чтения почти никогда не писали в базу.
+ACCESS_RESOLUTION = 1.0
+STATS_FLUSH_LOOKUPS = 100
+STATS_FLUSH_INTERVAL = 5.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    hits INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    entries INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES (1, 0, 0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE stats SET bytes = bytes + new.size, entries = entries + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache
+BEGIN
+    UPDATE stats SET bytes = bytes + new.size - old.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE stats SET bytes = bytes - old.size, entries = entries - 1;
+END;
+'''
+
+UPSERT = (
+    'INSERT INTO cache (key, value, expires, accessed, size) '
+    'VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+    'value = excluded.value, expires = excluded.expires, '
+    'accessed = excluded.accessed, size = excluded.size'
+)
+
+
+def default_location():
+    """Файл в личном каталоге процесса в /dev/shm или во временном."""
+    root = (
+        SHARED_MEMORY if os.path.isdir(SHARED_MEMORY)
+        else tempfile.gettempdir()
+    )
+    directory = os.path.join(root, f'yatube-{os.getuid()}')
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    return os.path.join(directory, 'cache.sqlite3')
+
+
+def _check_owned(info, path, directory=False):
+    if info.st_uid != os.getuid():
+        raise ImproperlyConfigured(
+            f'{path} принадлежит другому пользователю, кэш не открыт'
+        )
+    if directory:
+        if not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o022:
+            raise ImproperlyConfigured(
+                f'{path} должен быть каталогом, закрытым на запись другим'
+            )
+    elif not stat.S_ISREG(info.st_mode):
+        raise ImproperlyConfigured(f'{path} не обычный файл, кэш не открыт')
+
+
+def check_location(path):
+    """Создаёт файл кэша с правами 0600 и проверяет, что он свой.
+
+    Чужой файл мог бы подложить в кэш pickle, выполняющий код при
+    чтении.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    _check_owned(os.lstat(directory), directory, directory=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        _check_owned(os.fstat(fd), path)
+    finally:
+        os.close(fd)
+    for companion in (path + '-wal', path + '-shm'):
+        if os.path.lexists(companion):
+            _check_owned(os.lstat(companion), companion)
+
+
+class SharedCache(BaseCache):
+    """Бэкенд кэша Django поверх общего файла SQLite с вытеснением LRU."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location or default_location()
+        self.max_size = int(options.get('MAX_SIZE', DEFAULT_MAX_SIZE))
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._hits = self._misses = 0
+        self._flushed = time.monotonic()
+
+    @property
+    def _db(self):
+        # Соединение своё у каждого потока и у каждого процесса после fork.
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            check_location(self.path)
+            db = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = OFF')
+            db.execute(f'PRAGMA mmap_size = {self.max_size * 2}')
+            db.executescript(SCHEMA)
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _count(self, hits, misses):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            due = (
+                self._hits + self._misses >= STATS_FLUSH_LOOKUPS
+                or time.monotonic() - self._flushed >= STATS_FLUSH_INTERVAL
+            )
+            if not due:
+                return
+            hits, misses = self._hits, self._misses
+            self._hits = self._misses = 0
+            self._flushed = time.monotonic()
+        self._db.execute(
+            'UPDATE stats SET hits = hits + ?, misses = misses + ?',
+            [hits, misses]
+        )
+
+    def _read(self, keys):
+        """Живые значения по готовым ключам; отмечает их чтение."""
+        now = time.time()
+        found = {}
+        stale = []
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._db.execute(
+            'SELECT key, value, expires, accessed FROM cache '
+            f'WHERE key IN ({placeholders})', keys
+        )
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                continue
+            found[key] = pickle.loads(value)
+            if accessed < now - ACCESS_RESOLUTION:
+                stale.append(key)
+        if stale:
+            self._db.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                [(now, key) for key in stale]
+            )
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    @contextmanager
+    def _transaction(self):
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _write(self, db, items, timeout):
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = []
+        for key, value in items:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            rows.append((key, data, expires, now, len(key) + len(data)))
+        db.executemany(UPSERT, rows)
+        self._cull(db, now)
+
+    def _cull(self, db, now):
+        size, entries = db.execute(
+            'SELECT bytes, entries FROM stats'
+        ).fetchone()
+        if size <= self.max_size and entries <= self._max_entries:
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', [now])
+        while True:
+            size, entries = db.execute(
+                'SELECT bytes, entries FROM stats'
+            ).fetchone()
+            if (size <= self.max_size and entries <= self._max_entries
+                    or not entries):
+                return
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                [max(1, entries // self._cull_frequency)]
+            )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._read([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        made = {self.make_key(key, version=version): key for key in keys}
+        for key in made:
+            self.validate_key(key)
+        if not made:
+            return {}
+        found = self._read(list(made))
+        return {made[key]: value for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with self._transaction() as db:
+            self._write(db, [(key, value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            items.append((key, value))
+        if items:
+            with self._transaction() as db:
+                self._write(db, items, timeout)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT expires FROM cache WHERE key = ?', [key]
+            ).fetchone()
+            if row and (row[0] is None or row[0] > time.time()):
+                return False
+            self._write(db, [(key, value)], timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [self.get_backend_timeout(timeout), key, time.time()]
+        )
+        return bool(cursor.rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', [key]
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= time.time()):
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            db.execute(
+                'UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                [data, len(key) + len(data), key]
+            )
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._db.execute('DELETE FROM cache WHERE key = ?', [key])
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)', [key, time.time()]
+        ).fetchone() is not None
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def stats(self):
+        """Доля попаданий и занятая память по всем процессам."""
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        stored_hits, stored_misses, size, entries = self._db.execute(
+            'SELECT hits, misses, bytes, entries FROM stats'
+        ).fetchone()
+        hits += stored_hits
+        misses += stored_misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 3) if lookups else None,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_size,
+            'file_bytes': sum(
+                os.path.getsize(path)
+                for path in (self.path, self.path + '-wal')
+                if os.path.exists(path)
+            ),
+        }
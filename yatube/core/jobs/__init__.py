@@ -0,0 +1,57 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача — функция модуля, помеченная декоратором task. Вызов
+func.defer(...) ставит её в очередь после коммита текущей транзакции
+(transaction.on_commit), так что воркер не увидит данных, которые ещё
+могут откатиться. Воркеры (команда run_jobs) забирают задачи
+атомарным UPDATE, при ошибке повторяют их с растущей паузой, после
+max_attempts попыток оставляют в таблице со статусом failed.
+
+При JOBS_EAGER задачи выполняются сразу в вызывающем потоке. Так
+настроены только тесты: в разработке задачи, как и на сервере, ставятся
+в очередь после коммита и выполняются воркером.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+def enqueue(path, args=(), kwargs=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Ставит вызов функции по пути path в очередь после коммита."""
+    # Модель импортируется здесь: пакет загружается вместе с core.models.
+    from .models import Job
+
+    kwargs = kwargs or {}
+    if settings.JOBS_EAGER:
+        import_string(path)(*args, **kwargs)
+        return
+    payload = json.dumps({'args': list(args), 'kwargs': kwargs})
+    transaction.on_commit(lambda: Job.objects.create(
+        task=path, payload=payload, max_attempts=max_attempts
+    ))
+
+
+def task(func=None, *, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Добавляет функции метод defer для отложенного вызова.
+
+    Аргументы задачи должны сериализоваться в JSON: передавайте id,
+    а не объекты моделей.
+    """
+    def decorator(func):
+        path = f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def defer(*args, **kwargs):
+            enqueue(path, args, kwargs, max_attempts=max_attempts)
+
+        func.defer = defer
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не удалась'),
+    )
+
+    task = models.CharField('Задача', max_length=255)
+    payload = models.TextField('Аргументы')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.IntegerField('Попыток', default=0)
+    max_attempts = models.IntegerField('Предел попыток')
+    run_at = models.DateTimeField('Запустить после', default=timezone.now)
+    locked_until = models.DateTimeField('Занята до', null=True, blank=True)
+    error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Поставлена', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'задачи'
+        indexes = [models.Index(fields=['status', 'run_at'])]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
@@ -0,0 +1,76 @@
+"""Выполнение задач из очереди."""
+import json
+import traceback
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+# Сколько задача может выполняться, прежде чем её заберёт другой
+# воркер: так не теряются задачи упавших процессов.
+LEASE = timedelta(minutes=10)
+RETRY_DELAY = timedelta(seconds=10)
+
+
+def _runnable(now):
+    return (
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim(limit):
+    """Забирает до limit готовых задач, не пересекаясь с другими воркерами."""
+    now = timezone.now()
+    candidates = Job.objects.filter(_runnable(now)).order_by(
+        'run_at'
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in list(candidates):
+        # UPDATE с тем же условием: задачу получает только один воркер.
+        taken = Job.objects.filter(_runnable(now), pk=pk).update(
+            status=Job.RUNNING,
+            locked_until=now + LEASE,
+            attempts=F('attempts') + 1,
+        )
+        if taken:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_at'))
+
+
+def run(job):
+    """Выполняет задачу; True, если она завершилась успешно."""
+    try:
+        payload = json.loads(job.payload)
+        import_string(job.task)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, locked_until=None, error=error
+            )
+        else:
+            delay = RETRY_DELAY * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED,
+                locked_until=None,
+                run_at=timezone.now() + delay,
+                error=error,
+            )
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def work(limit):
+    """Один проход воркера: (выполнено, с ошибкой)."""
+    done = failed = 0
+    for job in claim(limit):
+        if run(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,177 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import benchmark
+from core.sqlite import pragma_statements
+
+SCHEMA = '''
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY,
+    author INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    pub_date REAL NOT NULL
+);
+CREATE INDEX post_author ON post (author, pub_date);
+'''
+READ = (
+    'SELECT id, text, pub_date FROM post WHERE author = ? '
+    'ORDER BY pub_date DESC LIMIT 10'
+)
+WRITE = 'INSERT INTO post (author, text, pub_date) VALUES (?, ?, ?)'
+AUTHORS = 100
+
+
+class Profile:
+    """Как открываются соединения: настройки по умолчанию или наши."""
+
+    def __init__(self, name, pragmas, reuse):
+        self.name = name
+        self.pragmas = pragmas
+        self.reuse = reuse
+
+    def connect(self, path):
+        db = sqlite3.connect(path, isolation_level=None)
+        try:
+            for statement in pragma_statements(self.pragmas):
+                db.execute(statement)
+        except sqlite3.Error:
+            db.close()
+            raise
+        return db
+
+
+PROFILES = (
+    # Как было: журнал отката и новое соединение на каждый запрос.
+    Profile('default', {'journal_mode': 'DELETE'}, reuse=False),
+    Profile('tuned', settings.SQLITE_PRAGMAS, reuse=True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при параллельных '
+        'чтениях и записях без настроек и с SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--output', help='Куда записать JSON-отчёт')
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in PROFILES:
+                path = os.path.join(directory, f'{profile.name}.sqlite3')
+                self.prepare(path, options['rows'])
+                results[profile.name] = self.run(profile, path, options)
+                self.stdout.write(
+                    f'{profile.name}: {json.dumps(results[profile.name])}'
+                )
+        for kind in ('reads', 'writes'):
+            before = results['default'][f'{kind}_per_second']
+            after = results['tuned'][f'{kind}_per_second']
+            if before:
+                self.stdout.write(f'{kind}: x{after / before:.2f}')
+        if options['output']:
+            benchmark.write_report(
+                benchmark.report(
+                    results,
+                    seconds=options['seconds'],
+                    readers=options['readers'],
+                    writers=options['writers'],
+                    rows=options['rows'],
+                ),
+                options['output'],
+            )
+
+    def prepare(self, path, rows):
+        db = sqlite3.connect(path)
+        db.executescript(SCHEMA)
+        now = time.time()
+        db.executemany(WRITE, (
+            (number % AUTHORS, f'Пост {number}', now - number)
+            for number in range(rows)
+        ))
+        db.commit()
+        db.close()
+
+    def run(self, profile, path, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies = {'reads': [], 'writes': []}
+        errors = []
+
+        def worker(kind, statement, params):
+            done, failed = hammer(profile, path, statement, params, stop)
+            with lock:
+                latencies[kind].extend(done)
+                errors.append(failed)
+
+        def read_params():
+            return [random.randrange(AUTHORS)]
+
+        def write_params():
+            return [random.randrange(AUTHORS), 'Новый пост', time.time()]
+
+        threads = [
+            threading.Thread(target=worker, args=('reads', READ, read_params))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=worker, args=('writes', WRITE, write_params)
+            )
+            for _ in range(options['writers'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        result = {'errors': sum(errors)}
+        for kind, values in latencies.items():
+            result[f'{kind}_per_second'] = round(len(values) / elapsed, 1)
+            if values:
+                summary = benchmark.summarize(values)
+                result[f'{kind}_p50_ms'] = summary['p50_ms']
+                result[f'{kind}_p99_ms'] = summary['p99_ms']
+        return result
+
+
+def hammer(profile, path, statement, params, stop):
+    """Выполняет statement до stop, возвращает задержки и число ошибок."""
+    done = []
+    failed = 0
+    db = profile.connect(path) if profile.reuse else None
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                if db is not None:
+                    db.execute(statement, params()).fetchall()
+                else:
+                    with closing(profile.connect(path)) as connection:
+                        connection.execute(statement, params()).fetchall()
+            except sqlite3.OperationalError:
+                # database is locked: драйвер не дождался блокировки.
+                failed += 1
+                continue
+            done.append(time.perf_counter() - started)
+    finally:
+        if db is not None:
+            db.close()
+    return done, failed
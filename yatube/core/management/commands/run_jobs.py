@@ -0,0 +1,56 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import worker
+
+
+class Command(BaseCommand):
+    help = 'Воркер очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые задачи'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза между проверками пустой очереди, секунд'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=20,
+            help='Сколько задач брать за один проход'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов-воркеров'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] == 1:
+            self.work(options)
+            return
+        # Дочерние процессы открывают свои соединения с базой.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=self.work, args=(options,))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    def work(self, options):
+        while True:
+            done, failed = worker.work(options['batch'])
+            if done or failed:
+                self.stdout.write(
+                    f'Выполнено задач: {done}, с ошибкой: {failed}'
+                )
+            if not options['loop'] and not (done or failed):
+                return
+            if not (done or failed):
+                time.sleep(options['interval'])
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файл реплики READ_REPLICA '
+        'через backup API: читатели реплики не видят полузаписанной копии'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to', help='Файл реплики, по умолчанию из READ_REPLICA'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Повторять копирование каждые --interval секунд'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        path = options['to']
+        if not path:
+            if not settings.READ_REPLICA:
+                raise CommandError('Задайте YATUBE_DB_REPLICA или --to')
+            path = settings.DATABASES[settings.READ_REPLICA]['NAME']
+        source = connections['default']
+        if source.vendor != 'sqlite':
+            raise CommandError('Копирование реплики работает только с SQLite')
+        while True:
+            started = time.perf_counter()
+            self.copy(source, path)
+            # Страницы, собранные со старой копии, больше не читаются.
+            replicas.new_generation()
+            self.stdout.write(
+                f'Реплика {path} обновлена за '
+                f'{time.perf_counter() - started:.2f} с'
+            )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, source, path):
+        source.ensure_connection()
+        # Копия пишется поверх живого файла: в режиме WAL читатели
+        # реплики до конца копирования видят прежний снимок.
+        target = sqlite3.connect(path, timeout=30)
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
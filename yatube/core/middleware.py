@@ -0,0 +1,68 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import replicas, timing
+
+
+class ServerTimingMiddleware:
+    """Замеряет SQL, шаблоны и кэш каждого запроса.
+
+    Итог уходит в заголовок Server-Timing и в скользящую статистику
+    по имени URL (timing.aggregate). Включается настройкой
+    REQUEST_TIMING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        timing.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = timing.start(settings.REQUEST_TIMING_SLOWEST)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.query_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+        total = timings.total
+        response['Server-Timing'] = server_timing(timings, total)
+        match = request.resolver_match
+        name = match.view_name if match else 'unresolved'
+        timing.aggregate.add(name, timings, total)
+        return response
+
+
+def server_timing(timings, total):
+    hits, misses = timings.cache_hits, timings.cache_misses
+    return ', '.join((
+        f'db;dur={timings.sql * 1000:.2f};desc="{timings.queries} queries"',
+        f'tpl;dur={timings.template * 1000:.2f}',
+        f'cache;desc="{hits} hits, {misses} misses"',
+        f'total;dur={total * 1000:.2f}',
+    ))
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет за основной базой сессии, которые что-то изменили.
+
+    Стоит после SessionMiddleware. Включается настройкой READ_REPLICA.
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in replicas.SAFE_METHODS:
+            replicas.pin(request)
+        return response
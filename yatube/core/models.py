@@ -0,0 +1 @@
+from .jobs.models import Job  # noqa: F401
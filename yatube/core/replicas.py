@@ -0,0 +1,93 @@
+"""Чтение лент с реплики базы.
+
+Декоратор read_from_replica направляет чтения view на реплику
+READ_REPLICA, записи всегда идут в default. Реплика отстаёт от
+основной базы, поэтому после любого изменяющего запроса сессия
+пользователя на REPLICA_PIN_SECONDS закрепляется за основной базой
+(ReplicaPinMiddleware): переход из post_create в profile видит новый
+пост. Без READ_REPLICA всё читается из default.
+
+Страница, прочитанная с реплики, могла не увидеть записи, которая уже
+подняла версии кэша. Поэтому в ключи кэша таких страниц входит
+поколение реплики (generation), а sync_replica меняет его после каждой
+копии: устаревшая страница живёт в кэше не дольше отставания реплики.
+"""
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+PIN_KEY = '_primary_until'
+GENERATION_KEY = 'replica:generation'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_local = threading.local()
+
+
+def using_replica():
+    return getattr(_local, 'replica', False)
+
+
+def pin(request):
+    """Закрепляет сессию за основной базой на REPLICA_PIN_SECONDS."""
+    if not settings.READ_REPLICA:
+        return
+    request.session[PIN_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return session is not None and session.get(PIN_KEY, 0) > time.time()
+
+
+def read_from_replica(view):
+    """Чтения view идут на реплику, если сессия не закреплена."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.READ_REPLICA or is_pinned(request):
+            return view(request, *args, **kwargs)
+        previous = using_replica()
+        _local.replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _local.replica = previous
+    wrapper.reads_replica = True
+    return wrapper
+
+
+def generation(view):
+    """Поколение реплики для ключа кэша страницы view.
+
+    Пустая строка, если view читает только основную базу.
+    """
+    if not settings.READ_REPLICA or not getattr(view, 'reads_replica', False):
+        return ''
+    return str(cache.get(GENERATION_KEY, 0))
+
+
+def new_generation():
+    """Вызывается после копирования реплики."""
+    cache.set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if settings.READ_REPLICA and using_replica():
+            return settings.READ_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия default, объекты из обеих баз связаны.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает на реплику вместе с данными, командой sync_replica.
+        if db == settings.READ_REPLICA:
+            return False
+        return None
@@ -0,0 +1,140 @@
+"""Объединение одинаковых дорогих вычислений (single-flight).
+
+do() выполняет функцию один раз на ключ среди одновременных вызовов
+в процессе: остальные потоки ждут и получают тот же результат.
+cached() добавляет кэш Django: промах считает один процесс под
+блокировкой cache.add, остальные ждут готовое значение до wait
+секунд. Значение старше timeout, но младше timeout + stale,
+отдаётся сразу, а пересчитывает его один запрос, взявший блокировку
+(stale-while-revalidate).
+"""
+import pickle
+import threading
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http.response import HttpResponseBase
+
+DEFAULT_WAIT = 5
+POLL = 0.05
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _own(value):
+    # Ответ дальше меняют middleware (заголовки, cookies), поэтому
+    # каждый ожидавший поток получает свою копию.
+    if isinstance(value, HttpResponseBase) and not value.streaming:
+        return pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    return value
+
+
+def do(key, func):
+    """Результат func(); одновременные вызовы с key ждут первый."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return _own(flight.result)
+    try:
+        flight.result = func()
+    except BaseException as error:
+        flight.error = error
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.result
+
+
+def lock_key(key):
+    return f'singleflight:{key}'
+
+
+def _compute(key, func, timeout, stale, store_if):
+    value = func()
+    if store_if is None or store_if(value):
+        cache.set(key, (value, time.time() + timeout), timeout + stale)
+    return value
+
+
+def _refresh(key, func, timeout, stale, store_if):
+    try:
+        return _compute(key, func, timeout, stale, store_if)
+    finally:
+        cache.delete(lock_key(key))
+
+
+def _load_missing(key, func, timeout, stale, wait, store_if):
+    if cache.add(lock_key(key), 1, wait):
+        return _refresh(key, func, timeout, stale, store_if)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if cache.get(lock_key(key)) is None:
+            # Владелец блокировки не сохранил значение.
+            break
+    return _compute(key, func, timeout, stale, store_if)
+
+
+def cached(key, func, timeout, stale=0, wait=DEFAULT_WAIT, store_if=None):
+    """Значение func() из кэша, один пересчёт на ключ на все процессы.
+
+    store_if(value) решает, сохранять ли значение, например ответ
+    с ошибкой сохранять не нужно.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        # Свежее значение или устаревшее, которое уже пересчитывают.
+        if time.time() < fresh_until or not cache.add(
+            lock_key(key), 1, wait
+        ):
+            return value
+        return _refresh(key, func, timeout, stale, store_if)
+    return do(key, lambda: _load_missing(
+        key, func, timeout, stale, wait, store_if
+    ))
+
+
+def single_flight(key, timeout=None, stale=0, wait=DEFAULT_WAIT,
+                  store_if=None):
+    """Декоратор: вызовы с одинаковым key(*args, **kwargs) объединяются.
+
+    Без timeout объединяются только одновременные вызовы в процессе,
+    с timeout результат идёт через cached(). Если key вернул None,
+    функция вызывается как есть.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            flight_key = key(*args, **kwargs)
+            if flight_key is None:
+                return func(*args, **kwargs)
+
+            def call():
+                return func(*args, **kwargs)
+
+            if timeout is None:
+                return do(flight_key, call)
+            return cached(flight_key, call, timeout, stale, wait, store_if)
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+"""Загрузчик шаблонов для боевого режима (TEMPLATE_MODE=production).
+
+InliningLoader подставляет текст шаблонов из {% include 'имя' %} с
+постоянным именем прямо в исходник, поэтому base.html со всеми
+включениями разбирается один раз и рендерится без поиска
+вложенных шаблонов. Включения с with/only, с именем из переменной и
+шаблоны с extends или block остаются обычными include. Поверх
+загрузчика стоит django.template.loaders.cached.Loader, а warm_up
+разбирает все шаблоны проекта при старте процесса.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.template import Origin, TemplateDoesNotExist, engines
+from django.template.loaders.base import Loader
+
+STATIC_INCLUDE = re.compile(
+    r'''{%\s*include\s+(?P<quote>['"])(?P<name>[^'"]+)(?P=quote)\s*%}'''
+)
+NOT_INLINABLE = re.compile(r'{%\s*(extends|block)\b')
+
+
+class InliningLoader(Loader):
+    def __init__(self, engine, loaders):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+
+    def get_template_sources(self, template_name):
+        # Кэширующий загрузчик читает шаблон через origin.loader,
+        # поэтому источники отдаются от имени этого загрузчика.
+        for origin in self.inner_sources(template_name):
+            yield Origin(origin.name, origin.template_name, self)
+
+    def inner_sources(self, template_name):
+        for loader in self.loaders:
+            yield from loader.get_template_sources(template_name)
+
+    def get_contents(self, origin):
+        return self.inline(self.read(origin), [])
+
+    def read(self, origin):
+        for inner in self.inner_sources(origin.template_name):
+            if inner.name == origin.name:
+                return inner.loader.get_contents(inner)
+        raise TemplateDoesNotExist(origin)
+
+    def source(self, template_name):
+        for origin in self.inner_sources(template_name):
+            try:
+                return origin.loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+        return None
+
+    def inline(self, contents, parents):
+        def replace(match):
+            name = match.group('name')
+            included = self.source(name)
+            if (included is None or name in parents
+                    or NOT_INLINABLE.search(included)):
+                return match.group(0)
+            return self.inline(included, parents + [name])
+
+        return STATIC_INCLUDE.sub(replace, contents)
+
+
+def template_names(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_up():
+    """Разбирает шаблоны из TEMPLATES DIRS заранее. Число шаблонов."""
+    if settings.TEMPLATE_MODE != 'production':
+        return 0
+    engine = engines['django'].engine
+    names = set(template_names(engine.dirs))
+    for name in names:
+        engine.get_template(name)
+    return len(names)
@@ -0,0 +1,216 @@
+"""Замеры времени запроса: SQL, шаблоны и обращения к кэшу.
+
+Замеры включаются на время запроса через thread-local, поэтому вне
+ServerTimingMiddleware обёртки стоят почти ничего.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.backends.django import Template
+
+from .benchmark import percentile
+
+_local = threading.local()
+
+
+class RequestTimings:
+    def __init__(self, slowest_limit):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.slowest = []
+        self.slowest_limit = slowest_limit
+        self.template = 0.0
+        self.template_depth = 0
+        self.cache_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.sql += duration
+        if (len(self.slowest) < self.slowest_limit
+                or duration > self.slowest[-1][0]):
+            self.slowest.append((duration, sql))
+            self.slowest.sort(key=lambda item: -item[0])
+            del self.slowest[self.slowest_limit:]
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Замеры текущего запроса или None, если они выключены."""
+    return getattr(_local, 'timings', None)
+
+
+def start(slowest_limit):
+    _local.timings = RequestTimings(slowest_limit)
+    return _local.timings
+
+
+def stop():
+    _local.timings = None
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """Обёртка для connection.execute_wrapper."""
+    timings = current()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, time.perf_counter() - started)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Оборачивает рендер шаблонов и чтение из кэшей. Один раз."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _wrap_template_render()
+        backends = {type(caches[alias]) for alias in settings.CACHES}
+        for backend_class in backends:
+            _wrap_cache(backend_class)
+        _installed = True
+
+
+def _wrap_template_render():
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        timings = current()
+        if timings is None:
+            return render(self, context, request)
+        # render_to_string внутри шаблона не должен считаться дважды.
+        timings.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            timings.template_depth -= 1
+            if not timings.template_depth:
+                timings.template += time.perf_counter() - started
+
+    Template.render = timed_render
+
+
+def _wrap_cache(backend_class):
+    get = backend_class.get
+    get_many = backend_class.get_many
+    missing = object()
+
+    def timed_get(self, key, default=None, version=None):
+        value = get(self, key, missing, version)
+        timings = current()
+        # BaseCache.get_many вызывает get: ключ уже посчитан в get_many.
+        if timings is not None and not timings.cache_depth:
+            if value is missing:
+                timings.cache_misses += 1
+            else:
+                timings.cache_hits += 1
+        return default if value is missing else value
+
+    def timed_get_many(self, keys, version=None):
+        keys = list(keys)
+        timings = current()
+        if timings is None:
+            return get_many(self, keys, version)
+        timings.cache_depth += 1
+        try:
+            found = get_many(self, keys, version)
+        finally:
+            timings.cache_depth -= 1
+        if not timings.cache_depth:
+            timings.cache_hits += len(found)
+            timings.cache_misses += len(keys) - len(found)
+        return found
+
+    backend_class.get = timed_get
+    backend_class.get_many = timed_get_many
+
+
+class Aggregate:
+    """Скользящая статистика по именам URL в памяти процесса."""
+
+    def __init__(self, window, slowest_limit):
+        self.window = window
+        self.slowest_limit = slowest_limit
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.views = defaultdict(self._empty)
+
+    def _empty(self):
+        return {
+            'requests': 0,
+            'durations': deque(maxlen=self.window),
+            'sql': deque(maxlen=self.window),
+            'queries': deque(maxlen=self.window),
+            'template': deque(maxlen=self.window),
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'slowest': [],
+        }
+
+    def add(self, name, timings, total):
+        with self.lock:
+            view = self.views[name]
+            view['requests'] += 1
+            view['durations'].append(total)
+            view['sql'].append(timings.sql)
+            view['queries'].append(timings.queries)
+            view['template'].append(timings.template)
+            view['cache_hits'] += timings.cache_hits
+            view['cache_misses'] += timings.cache_misses
+            slowest = view['slowest'] + timings.slowest
+            slowest.sort(key=lambda item: -item[0])
+            view['slowest'] = slowest[:self.slowest_limit]
+
+    def snapshot(self):
+        """Сводка для отдачи в JSON, времена в миллисекундах."""
+        with self.lock:
+            views = {name: dict(view) for name, view in self.views.items()}
+        result = {}
+        for name, view in views.items():
+            durations = [duration * 1000 for duration in view['durations']]
+            lookups = view['cache_hits'] + view['cache_misses']
+            result[name] = {
+                'requests': view['requests'],
+                'p50_ms': round(percentile(durations, 0.5), 3),
+                'p99_ms': round(percentile(durations, 0.99), 3),
+                'sql_ms': round(_mean(view['sql']) * 1000, 3),
+                'queries': round(_mean(view['queries']), 2),
+                'template_ms': round(_mean(view['template']) * 1000, 3),
+                'cache_hit_ratio': (
+                    round(view['cache_hits'] / lookups, 3) if lookups
+                    else None
+                ),
+                'slowest_queries': [
+                    {'ms': round(duration * 1000, 3), 'sql': sql[:500]}
+                    for duration, sql in view['slowest']
+                ],
+            }
+        return result
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+aggregate = Aggregate(
+    settings.REQUEST_TIMING_WINDOW, settings.REQUEST_TIMING_SLOWEST
+)
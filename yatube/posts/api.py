@@ -0,0 +1,131 @@
+"""JSON API лент только для чтения.
+
+Ленты отдаются страницами по курсору из тех же querysets, что и
+HTML-страницы. ETag собирается из даты самого нового поста, версий
+пространств имён кэша (их поднимают правки, удаления, комментарии и
+подписки) и параметров запроса. Повторный запрос с совпавшим ETag
+получает 304 без обращения к постам страницы. Last-Modified не
+отдаётся: одна дата не отражает правки и удаления, и If-Modified-Since
+отвечал бы 304 на изменившуюся ленту.
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from yatube.settings import POSTS_PER_PAGE
+
+from . import caching
+from .models import Group, Post, User
+from .pagination import CursorPaginator
+from .timelines import timeline
+from .views import comments_page
+
+FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group_id else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'thumbnail': lambda post: post.thumbnail_url or None,
+    'comments_count': lambda post: post.comments_count,
+}
+
+
+def selected_fields(request):
+    """Поля из ?fields=id,text; None, если попросили неизвестное."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(FIELDS)
+    fields = [field for field in requested.split(',') if field]
+    if not fields or any(field not in FIELDS for field in fields):
+        return None
+    return fields
+
+
+def serialize(post, fields):
+    return {field: FIELDS[field](post) for field in fields}
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def conditional(request, newest, namespaces, build, private=False):
+    """Отдаёт 304 или JSON из build(fields) с валидаторами кэша."""
+    fields = selected_fields(request)
+    if fields is None:
+        return JsonResponse(
+            {'errors': {'fields': sorted(FIELDS)}}, status=400
+        )
+    etag = caching.etag(namespaces, newest, request.get_full_path())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build(fields))
+    response['ETag'] = etag
+    patch_cache_control(
+        response, max_age=0, must_revalidate=True,
+        **{'private' if private else 'public': True}
+    )
+    return response
+
+
+def feed(request, queryset, namespaces, private=False):
+    newest = queryset.values_list('pub_date', flat=True).first()
+
+    def build(fields):
+        page = CursorPaginator(
+            queryset.for_feed(), POSTS_PER_PAGE
+        ).page_after(request.GET.get('cursor'))
+        return {
+            'results': [serialize(post, fields) for post in page],
+            'next_cursor': page.next_cursor,
+        }
+
+    return conditional(request, newest, namespaces, build, private)
+
+
+def index(request):
+    return feed(request, Post.objects.all(), ['posts'])
+
+
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed(request, group.posts.all(), [f'group:{slug}'])
+
+
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed(request, author.posts.all(), [f'profile:{username}'])
+
+
+@login_required
+def follow_index(request):
+    # Подписки и отписки меняют ленту, не трогая версию 'posts'.
+    namespaces = ['posts', f'follow:{request.user.pk}']
+    return feed(request, timeline(request.user), namespaces, private=True)
+
+
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.for_feed(), id=post_id
+    )
+
+    def build(fields):
+        comments = comments_page(post_id, request.GET.get('cursor'))
+        return {
+            'post': serialize(post, fields),
+            'comments': [
+                serialize_comment(comment) for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        }
+
+    namespaces = ['posts', f'post:{post_id}']
+    return conditional(request, post.pub_date, namespaces, build)
@@ -0,0 +1,114 @@
+"""Версионированный кэш страниц.
+
+Каждой странице соответствуют пространства имён ('posts',
+'group:<slug>', 'profile:<username>'), у каждого пространства есть
+номер версии. Номер входит в ключ кэша, поэтому запись в базу,
+поднявшая версию, сразу делает старые страницы недостижимыми.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.cache import cache_page
+
+from core import replicas
+
+VERSION_KEY = 'version:{}'
+CHANGED_KEY = 'changed:{}'
+
+
+def _initial_version():
+    # Если ключ версии вытеснят из кэша, новая версия всё равно
+    # окажется больше любой из прежних.
+    return int(time.time() * 1000)
+
+
+def versions(namespaces):
+    """Текущие версии пространств имён в том же порядке."""
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(*namespaces):
+    """Поднимает версии, устаревшие страницы больше не читаются."""
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+    now = time.time()
+    cache.set_many(
+        {CHANGED_KEY.format(namespace): now for namespace in namespaces}, None
+    )
+
+
+def last_changed(namespaces):
+    """Время последнего bump() пространств имён — для Last-Modified.
+
+    Время вытесненного из кэша ключа неизвестно и считается текущим.
+    """
+    keys = [CHANGED_KEY.format(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return max(found.values())
+
+
+def etag(namespaces, *parts):
+    """ETag из версий пространств имён и частей ответа.
+
+    Версии поднимают все записи, меняющие страницу, поэтому ETag
+    меняется и при правках и удалениях, которых не видно по датам.
+    """
+    state = [str(part) for part in parts] + [
+        str(version) for version in versions(namespaces)
+    ]
+    return quote_etag(hashlib.md5('|'.join(state).encode()).hexdigest())
+
+
+def post_namespaces(post):
+    """Пространства имён страниц, на которых виден пост."""
+    namespaces = ['posts', f'profile:{post.author.username}']
+    if post.group_id:
+        namespaces.append(f'group:{post.group.slug}')
+    return namespaces
+
+
+def versioned_cache_page(timeout, *namespaces):
+    """cache_page, в ключ которого входят версии пространств имён.
+
+    Пространства имён задаются шаблонами str.format, в которые
+    подставляются аргументы view, например 'group:{slug}'. Страница
+    кэшируется только на сервере: браузер не может узнать о новой
+    версии и должен спрашивать страницу каждый раз.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            current = versions(
+                [namespace.format(**kwargs) for namespace in namespaces]
+            )
+            key_prefix = ':'.join(
+                [view.__name__, replicas.generation(view)]
+                + [str(version) for version in current]
+            )
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(view)
+            response = cached_view(request, *args, **kwargs)
+            # cache_page разрешает браузеру хранить страницу timeout
+            # секунд, в том числе в сохранённой копии ответа.
+            del response['Expires']
+            patch_cache_control(response, private=True, max_age=0)
+            return response
+        return wrapper
+    return decorator
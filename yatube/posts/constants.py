@@ -1 +1,15 @@
 STR_LENGTH = 15
+
+THUMBNAIL_GEOMETRY = '960x339'
+
+THUMBNAIL_SRCSET_GEOMETRIES = ('480x170', '960x339', '1920x678')
+
+FEED_ITEMS = 50
+
+FEED_CHUNK_SIZE = 20
+
+FOLLOW_FEED_SALT = 'posts.follow_feed'
+
+# Карточка поста меняет ключ при каждой правке, поэтому её можно
+# держать в кэше долго.
+POST_CARD_TIMEOUT = 60 * 60 * 24
@@ -0,0 +1,53 @@
+"""Денормализованные счётчики постов, подписок и комментариев.
+
+Счётчики сдвигаются F()-выражениями в транзакции, поэтому параллельные
+записи не теряют обновлений. Расхождения с реальными данными
+исправляет команда reconcile_counters.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import AuthorStats, Follow, Post
+
+
+def exact(user_id):
+    """Счётчики автора, посчитанные по таблицам."""
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def stats_for(user):
+    """Счётчики автора; при первом обращении считаются по таблицам."""
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        stats, _ = AuthorStats.objects.get_or_create(
+            user_id=user.pk, defaults=exact(user.pk)
+        )
+        return stats
+
+
+def change(user_id, **deltas):
+    """Сдвигает счётчики автора, например change(1, posts_count=1)."""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    with transaction.atomic():
+        if AuthorStats.objects.filter(user_id=user_id).update(**updates):
+            return
+        if any(delta < 0 for delta in deltas.values()):
+            # Строки ещё нет, а пользователь может удаляться каскадом:
+            # её посчитают заново при следующем обращении.
+            return
+        _, created = AuthorStats.objects.get_or_create(
+            user_id=user_id, defaults=exact(user_id)
+        )
+        if not created:
+            AuthorStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def change_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
@@ -0,0 +1,54 @@
+"""Число постов в больших лентах для пагинатора.
+
+COUNT(*) по всем постам проходит всю таблицу, поэтому главная и
+страницы групп берут число из кэша. Устаревшее число отдаётся как
+есть, а пересчёт уходит фоновой задачей, не чаще раза в
+POST_COUNT_REFRESH секунд. Пока точного числа для всех постов ещё нет,
+вместо него берётся наибольший id. Профиль считает страницы по
+счётчику AuthorStats, лента подписок — обычным COUNT(*) по своим
+записям.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Max
+
+from yatube.settings import POST_COUNT_REFRESH
+
+from . import tasks
+from .models import Post
+
+COUNT_KEY = 'post_count:{}'
+REFRESH_KEY = 'post_count_refresh:{}'
+
+
+def exact(filters):
+    return Post.objects.filter(**filters).count()
+
+
+def refresh(name, filters):
+    cache.set(COUNT_KEY.format(name), (exact(filters), time.time()), None)
+
+
+def estimate(filters):
+    """Число на время, пока пересчёт не готов: (число, когда посчитано)."""
+    if filters:
+        return exact(filters), time.time()
+    # id не переиспользуются, поэтому оценка не меньше числа постов.
+    return Post.objects.aggregate(last=Max('pk'))['last'] or 0, 0
+
+
+def post_count(name, **filters):
+    """Число постов ленты name, отобранных по filters, возможно устаревшее."""
+    key = COUNT_KEY.format(name)
+    entry = cache.get(key)
+    if entry is None or time.time() - entry[1] >= POST_COUNT_REFRESH:
+        # add() пропускает один пересчёт за интервал на все процессы.
+        if cache.add(REFRESH_KEY.format(name), 1, POST_COUNT_REFRESH):
+            tasks.refresh_post_count.defer(name, filters)
+            # При JOBS_EAGER задача уже выполнилась.
+            entry = cache.get(key, entry)
+    if entry is None:
+        entry = estimate(filters)
+        cache.set(key, entry, None)
+    return entry[0]
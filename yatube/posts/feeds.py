@@ -0,0 +1,179 @@
+"""Потоковые ленты Atom и RSS для групп, авторов и подписок.
+
+Элементы ленты пишутся генераторами feedgenerator из Django, но не в
+одну строку, а по одному посту: ответ StreamingHttpResponse уходит
+клиенту по мере чтения постов из базы пачками. If-None-Match
+сверяется с ETag из версий пространств имён кэша, If-Modified-Since —
+со временем последнего изменения этих пространств имён, а не с датой
+самого нового поста: так видны и правки, и удаления. Проверки идут до
+запроса самих постов.
+
+Ссылка на ленту подписок подписана вместе с ключом из хэша пароля:
+смена пароля отзывает все выданные ссылки.
+"""
+import time
+from io import StringIO
+
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from . import caching
+from .constants import FEED_CHUNK_SIZE, FEED_ITEMS, FOLLOW_FEED_SALT
+from .models import Group, User
+from .timelines import timeline
+
+
+class StreamingFeedMixin:
+    def __init__(self, *args, newest=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.newest = newest
+
+    def latest_post_date(self):
+        return self.newest or super().latest_post_date()
+
+    def stream(self, posts, item):
+        """Отдаёт XML частями: заголовок, по посту, окончание."""
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        self.write_head(handler)
+        yield flush()
+        for post in posts:
+            self.add_item(**item(post))
+            entry = self.items.pop()
+            handler.startElement(
+                self.item_element, self.item_attributes(entry)
+            )
+            self.add_item_elements(handler, entry)
+            handler.endElement(self.item_element)
+            yield flush()
+        self.write_tail(handler)
+        yield flush()
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def write_head(self, handler):
+        handler.startDocument()
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def write_tail(self, handler):
+        handler.endElement('feed')
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def write_head(self, handler):
+        handler.startDocument()
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def write_tail(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+def feed_key(user):
+    return salted_hmac(FOLLOW_FEED_SALT, user.password).hexdigest()[:16]
+
+
+def follow_feed_token(user):
+    """Подпись id пользователя: ссылка на ленту подписок без входа."""
+    return signing.dumps([user.pk, feed_key(user)], salt=FOLLOW_FEED_SALT)
+
+
+def stream(request, queryset, title, link, namespaces):
+    newest = queryset.values_list('pub_date', flat=True).first()
+    etag = caching.etag(namespaces, newest, request.get_full_path())
+    changed = caching.last_changed(namespaces)
+    # Last-Modified точен до секунды: изменение в ту же секунду, что и
+    # прошлое, клиент не отличит, поэтому свежей ленте дата не ставится.
+    last_modified = int(changed) if time.time() - changed >= 1 else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        feed_class = (
+            StreamingRssFeed if request.GET.get('format') == 'rss'
+            else StreamingAtomFeed
+        )
+        feed = feed_class(
+            title=title,
+            link=request.build_absolute_uri(link),
+            description=title,
+            feed_url=request.build_absolute_uri(),
+            language='ru',
+            newest=newest,
+        )
+
+        def item(post):
+            url = request.build_absolute_uri(
+                reverse('posts:post_detail', args=[post.pk])
+            )
+            return {
+                'title': post.text[:50],
+                'link': url,
+                'unique_id': url,
+                'description': post.text,
+                'author_name': post.author.username,
+                'pubdate': post.pub_date,
+                'categories': [post.group.title] if post.group_id else (),
+            }
+
+        posts = queryset.for_feed()[:FEED_ITEMS].iterator(
+            chunk_size=FEED_CHUNK_SIZE
+        )
+        response = StreamingHttpResponse(
+            feed.stream(posts, item), content_type=feed.content_type
+        )
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def group_feed(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return stream(
+        request, group.posts.all(), group.title,
+        reverse('posts:group_posts', args=[slug]), [f'group:{slug}']
+    )
+
+
+def profile_feed(request, username):
+    author = get_object_or_404(User, username=username)
+    return stream(
+        request, author.posts.all(), f'Посты {username}',
+        reverse('posts:profile', args=[username]), [f'profile:{username}']
+    )
+
+
+def follow_feed(request, token):
+    try:
+        user_id, key = signing.loads(token, salt=FOLLOW_FEED_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise Http404
+    user = get_object_or_404(User, pk=user_id)
+    if not constant_time_compare(key, feed_key(user)):
+        raise Http404
+    return stream(
+        request, timeline(user), f'Подписки {user.username}',
+        reverse('posts:follow_index'), ['posts', f'follow:{user.pk}']
+    )
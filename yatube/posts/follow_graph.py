@@ -0,0 +1,227 @@
+"""Граф подписок в памяти процесса.
+
+Для каждого пользователя хранятся отсортированные массивы id авторов,
+на которых он подписан, и id подписчиков. Проверка подписки — бинарный
+поиск, списки подписок отдаются без запросов к базе.
+
+Граф загружается из таблицы Follow одним запросом при первом
+обращении. После коммита подписки версия 'follows' в кэше поднимается,
+а изменение записывается в журнал под ключом новой версии. Граф любого
+процесса, отставший от версии, применяет изменения из журнала и
+загружается заново, только если журнала не хватает: после записей в
+обход сигналов (reset) или вытеснения ключей. Пока транзакция с
+подпиской не завершена, граф читается из базы и не запоминается: после
+отката в памяти не должно остаться несуществующих подписок.
+"""
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from . import caching
+from .models import Follow
+
+NAMESPACE = 'follows'
+CHANGE_KEY = 'follows:change:{}'
+TYPECODE = 'l'
+# Журнал изменений: сколько он хранится и сколько изменений граф
+# догоняет, прежде чем проще загрузить его заново.
+CHANGE_TIMEOUT = 60 * 60
+MAX_CHANGES = 1000
+
+_graph = None
+_lock = threading.Lock()
+_pending = threading.local()
+
+
+def _contains(values, value):
+    index = bisect_left(values, value)
+    return index < len(values) and values[index] == value
+
+
+class FollowGraph:
+    def __init__(self, version, pairs=()):
+        self.version = version
+        self.following = {}
+        self.followers = {}
+        following = {}
+        followers = {}
+        for user_id, author_id in pairs:
+            following.setdefault(user_id, []).append(author_id)
+            followers.setdefault(author_id, []).append(user_id)
+        for target, source in (
+            (self.following, following), (self.followers, followers)
+        ):
+            for user_id, ids in source.items():
+                target[user_id] = array(TYPECODE, sorted(ids))
+
+    @classmethod
+    def load(cls, version):
+        # Только основная база: реплика может отставать от версии.
+        # Порядок уникального индекса: читается только индекс.
+        pairs = Follow.objects.using(DEFAULT_DB_ALIAS).values_list(
+            'user_id', 'author_id'
+        ).order_by('user_id', 'author_id')
+        return cls(version, pairs.iterator())
+
+    def is_following(self, user_id, author_id):
+        return _contains(self.following.get(user_id, ()), author_id)
+
+    def followees(self, user_id):
+        return list(self.following.get(user_id, ()))
+
+    def followers_of(self, author_id):
+        return list(self.followers.get(author_id, ()))
+
+    def mutuals(self, user_id):
+        """Пользователи, подписанные друг на друга с user_id."""
+        following = set(self.following.get(user_id, ()))
+        return sorted(following.intersection(self.followers.get(user_id, ())))
+
+    def suggestions(self, user_id, limit=10):
+        """Авторы, на которых подписаны авторы из подписок user_id.
+
+        Чем больше таких общих подписок, тем выше автор в списке.
+        """
+        followed = self.following.get(user_id, ())
+        votes = Counter()
+        for author_id in followed:
+            votes.update(self.following.get(author_id, ()))
+        for author_id in followed:
+            votes.pop(author_id, None)
+        votes.pop(user_id, None)
+        ranked = sorted(votes.items(), key=lambda item: (-item[1], item[0]))
+        return [author_id for author_id, _ in ranked[:limit]]
+
+    def add(self, user_id, author_id):
+        for target, key, value in (
+            (self.following, user_id, author_id),
+            (self.followers, author_id, user_id),
+        ):
+            values = target.setdefault(key, array(TYPECODE))
+            if not _contains(values, value):
+                insort(values, value)
+
+    def remove(self, user_id, author_id):
+        for target, key, value in (
+            (self.following, user_id, author_id),
+            (self.followers, author_id, user_id),
+        ):
+            values = target.get(key, ())
+            index = bisect_left(values, value)
+            if index < len(values) and values[index] == value:
+                del values[index]
+
+
+def _savepoints():
+    return tuple(connection.savepoint_ids)
+
+
+def _in_pending_transaction():
+    """Идёт ли транзакция с ещё не закоммиченной подпиской."""
+    marker = getattr(_pending, 'savepoints', None)
+    if marker is None:
+        return False
+    current = _savepoints()
+    depth = min(len(marker), len(current))
+    if connection.in_atomic_block and marker[:depth] == current[:depth]:
+        return True
+    _pending.savepoints = None
+    return False
+
+
+def _catch_up(graph, version):
+    """Применяет к graph журнал до version, False — журнала не хватает."""
+    if not 0 <= version - graph.version <= MAX_CHANGES:
+        return False
+    keys = [
+        CHANGE_KEY.format(number)
+        for number in range(graph.version + 1, version + 1)
+    ]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return False
+    for key in keys:
+        following, user_id, author_id = changes[key]
+        if following:
+            graph.add(user_id, author_id)
+        else:
+            graph.remove(user_id, author_id)
+    graph.version = version
+    return True
+
+
+def get_graph():
+    """Граф текущей версии, при необходимости догнавший журнал."""
+    global _graph
+    version = caching.versions([NAMESPACE])[0]
+    if _in_pending_transaction():
+        return FollowGraph.load(version)
+    graph = _graph
+    if graph is not None and graph.version == version:
+        return graph
+    # Потоки процесса догоняют и загружают граф по одному.
+    with _lock:
+        version = caching.versions([NAMESPACE])[0]
+        graph = _graph
+        if graph is None or not _catch_up(graph, version):
+            graph = FollowGraph.load(version)
+            _graph = graph
+    return graph
+
+
+def _log(following, user_id, author_id):
+    _pending.savepoints = None
+    try:
+        version = cache.incr(caching.VERSION_KEY.format(NAMESPACE))
+    except ValueError:
+        # Версию вытеснили: новая не продолжает журнал, графы
+        # загрузятся заново.
+        caching.bump(NAMESPACE)
+        return
+    cache.set(
+        CHANGE_KEY.format(version), (following, user_id, author_id),
+        CHANGE_TIMEOUT
+    )
+
+
+def _changed(following, user_id, author_id):
+    if connection.in_atomic_block:
+        _pending.savepoints = _savepoints()
+    transaction.on_commit(lambda: _log(following, user_id, author_id))
+
+
+def followed(user_id, author_id):
+    _changed(True, user_id, author_id)
+
+
+def unfollowed(user_id, author_id):
+    _changed(False, user_id, author_id)
+
+
+def reset():
+    """После записей в Follow в обход сигналов (bulk_create, импорт)."""
+    caching.bump(NAMESPACE)
+
+
+def is_following(user_id, author_id):
+    return get_graph().is_following(user_id, author_id)
+
+
+def followees(user_id):
+    return get_graph().followees(user_id)
+
+
+def followers(author_id):
+    return get_graph().followers_of(author_id)
+
+
+def mutuals(user_id):
+    return get_graph().mutuals(user_id)
+
+
+def suggestions(user_id, limit=10):
+    return get_graph().suggestions(user_id, limit)
@@ -8,6 +8,18 @@ class PostForm(ModelForm):
         model = Post
         fields = ('group', 'text', 'image')
 
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        if 'image' in self.changed_data:
+            # Старые превью больше не подходят, новые посчитает
+            # фоновый обработчик render_thumbnails.
+            post.thumbnail_url = ''
+            post.thumbnail_srcset = ''
+            post.thumbnails_pending = True
+        if commit:
+            post.save()
+        return post
+
 
 class CommentForm(ModelForm):
     class Meta:
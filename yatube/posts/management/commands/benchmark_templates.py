@@ -0,0 +1,142 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from core import benchmark
+from posts.counters import stats_for
+from posts.feeds import follow_feed_token
+from posts.forms import CommentForm, PostForm
+from posts.models import Group, Post
+from posts.pagination import paginator_context
+from posts.timelines import timeline
+from posts.views import comments_page
+
+User = get_user_model()
+
+TEMPLATES = (
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/follow.html',
+    'posts/post_detail.html',
+    'posts/create_post.html',
+)
+
+
+def page(queryset, request):
+    # Посты читаются до замера: считается только рендер.
+    page_obj = paginator_context(queryset, request)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время рендера шаблонов лент на готовом контексте '
+        'и пишет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Не очищать кэш карточек постов между рендерами'
+        )
+        parser.add_argument('--templates', nargs='+', choices=TEMPLATES)
+        parser.add_argument('--output', help='Куда записать JSON-отчёт')
+        parser.add_argument(
+            '--compare',
+            help='JSON-отчёт прошлого запуска для поиска регрессий'
+        )
+        parser.add_argument('--tolerance', type=float, default=0.1)
+
+    def contexts(self, request):
+        """Контексты шаблонов на самых тяжёлых данных, как во view."""
+        post = Post.objects.for_feed().order_by('-comments_count').first()
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        if not (post and group and author):
+            raise CommandError('Мало данных, сначала запустите seed_data')
+        reader = request.user
+        stats = stats_for(author)
+        return {
+            'posts/index.html': {
+                'page_obj': page(Post.objects.for_feed(), request),
+            },
+            'posts/group_list.html': {
+                'group': group,
+                'page_obj': page(group.posts.for_feed(), request),
+            },
+            'posts/profile.html': {
+                'author': author,
+                'post_count': stats.posts_count,
+                'stats': stats,
+                'following': False,
+                'page_obj': page(author.posts.for_feed(), request),
+            },
+            'posts/follow.html': {
+                'page_obj': page(timeline(reader).for_feed(), request),
+                'feed_token': follow_feed_token(reader),
+            },
+            'posts/post_detail.html': {
+                'post': post,
+                'posts_count': stats_for(post.author).posts_count,
+                'form': CommentForm(),
+                'comments': comments_page(post.pk, None),
+            },
+            'posts/create_post.html': {'form': PostForm()},
+        }
+
+    def handle(self, *args, **options):
+        reader = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total').first()
+        if reader is None:
+            raise CommandError('Мало данных, сначала запустите seed_data')
+        request = RequestFactory().get('/')
+        request.user = reader
+        contexts = self.contexts(request)
+
+        results = {}
+        for name in options['templates'] or TEMPLATES:
+            context = contexts[name]
+
+            def render():
+                if not options['cached']:
+                    cache.clear()
+                render_to_string(name, context, request)
+
+            results[name] = benchmark.measure(
+                render, options['runs'], options['warmup']
+            )
+            self.stdout.write(f'{name}: {json.dumps(results[name])}')
+
+        data = benchmark.report(
+            results,
+            runs=options['runs'],
+            cached=options['cached'],
+            template_mode=settings.TEMPLATE_MODE,
+        )
+        if options['output']:
+            benchmark.write_report(data, options['output'])
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+            regressions = benchmark.compare(
+                baseline, data, tolerance=options['tolerance']
+            )
+            for name, (before, after) in regressions.items():
+                self.stderr.write(f'Регрессия {name}: {before} -> {after} мс')
+            if regressions:
+                raise CommandError('Найдены регрессии производительности')
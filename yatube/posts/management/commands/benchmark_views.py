@@ -0,0 +1,113 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from core import benchmark
+from posts.models import Group, Post
+
+User = get_user_model()
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail', 'follow_index')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p99, число запросов и память для лент постов '
+        'и пишет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--page', type=int, default=1,
+            help='Номер страницы ленты, глубокие страницы медленнее'
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Не очищать кэш между запросами'
+        )
+        parser.add_argument('--views', nargs='+', choices=VIEWS)
+        parser.add_argument('--output', help='Куда записать JSON-отчёт')
+        parser.add_argument(
+            '--compare',
+            help='JSON-отчёт прошлого запуска для поиска регрессий'
+        )
+        parser.add_argument('--tolerance', type=float, default=0.1)
+
+    def targets(self):
+        """Самые тяжёлые страницы каждой ленты в текущих данных."""
+        post = Post.objects.order_by('-comments_count').first()
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        reader = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total').first()
+        if not (post and group and author and reader):
+            raise CommandError('Мало данных, сначала запустите seed_data')
+        return reader, {
+            'index': reverse('posts:home_page'),
+            'group_posts': reverse(
+                'posts:group_posts', kwargs={'slug': group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': author.username}
+            ),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': post.pk}
+            ),
+            'follow_index': reverse('posts:follow_index'),
+        }
+
+    def handle(self, *args, **options):
+        reader, urls = self.targets()
+        client = Client()
+        client.force_login(reader)
+        params = {'page': options['page']}
+
+        results = {}
+        for name in options['views'] or VIEWS:
+            url = urls[name]
+
+            def request():
+                if not options['cached']:
+                    cache.clear()
+                response = client.get(url, params)
+                if response.status_code != 200:
+                    raise CommandError(f'{url}: {response.status_code}')
+
+            results[name] = benchmark.measure(
+                request, options['runs'], options['warmup']
+            )
+            results[name]['url'] = url
+            self.stdout.write(f'{name}: {json.dumps(results[name])}')
+
+        data = benchmark.report(
+            results,
+            runs=options['runs'],
+            page=options['page'],
+            cached=options['cached'],
+            posts=Post.objects.count(),
+            users=User.objects.count(),
+        )
+        if options['output']:
+            benchmark.write_report(data, options['output'])
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+            regressions = benchmark.compare(
+                baseline, data, tolerance=options['tolerance']
+            )
+            for name, (before, after) in regressions.items():
+                self.stderr.write(f'Регрессия {name}: {before} -> {after} мс')
+            if regressions:
+                raise CommandError('Найдены регрессии производительности')
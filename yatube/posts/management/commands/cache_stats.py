@@ -0,0 +1,15 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий и занятую память общего кэша'
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, 'stats'):
+            raise CommandError(
+                'Статистику ведёт только core.cache.SharedCache '
+                '(YATUBE_CACHE=shared)'
+            )
+        for name, value in cache.stats().items():
+            self.stdout.write(f'{name}: {value}')
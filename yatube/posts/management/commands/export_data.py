@@ -0,0 +1,32 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты, комментарии и подписки в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную выгрузку с контрольной точки'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        os.makedirs(directory, exist_ok=True)
+        if not options['resume']:
+            transfer.Checkpoint(directory).clear()
+        checkpoint = transfer.Checkpoint(directory)
+        for kind in transfer.FIELDS:
+            count = transfer.export(
+                kind, directory, options['format'], checkpoint
+            )
+            self.stdout.write(f'{kind}: {count}')
+        checkpoint.clear()
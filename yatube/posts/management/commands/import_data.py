@@ -0,0 +1,79 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection
+
+from posts import caching, counts, follow_graph, tasks, transfer
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = 'Загружает посты, комментарии и подписки из NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную загрузку с контрольной точки'
+        )
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Не пересчитывать счётчики, ленты, поисковый индекс и превью'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not options['resume']:
+            transfer.Checkpoint(directory).clear()
+        checkpoint = transfer.Checkpoint(directory)
+        for kind in transfer.FIELDS:
+            count = transfer.load(
+                kind, directory, options['format'], checkpoint
+            )
+            self.stdout.write(f'{kind}: {count}')
+        checkpoint.clear()
+        # id пришли из файла, счётчики id нужно сдвинуть за них.
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(transfer.MODELS.values())
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        # Граф подписок в памяти процессов не видел загруженных подписок.
+        follow_graph.reset()
+        # bulk_create не вызывает сигналы: производные данные
+        # пересчитываются целиком.
+        self.invalidate_pages()
+        if not options['skip_derived']:
+            call_command('reconcile_counters', stdout=self.stdout)
+            call_command('backfill_timelines', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+            self.refresh_post_counts()
+            self.queue_thumbnails()
+
+    def invalidate_pages(self):
+        """Поднимает версии всех лент: в них могли попасть новые посты."""
+        caching.bump('posts')
+        for slug in Group.objects.values_list('slug', flat=True).iterator():
+            caching.bump(f'group:{slug}')
+        users = User.objects.values_list('pk', 'username')
+        for pk, username in users.iterator():
+            caching.bump(f'profile:{username}', f'follow:{pk}')
+
+    def refresh_post_counts(self):
+        counts.refresh('posts', {})
+        for pk, slug in Group.objects.values_list('pk', 'slug').iterator():
+            counts.refresh(f'group:{slug}', {'group_id': pk})
+
+    def queue_thumbnails(self):
+        posts = Post.objects.exclude(image='').filter(thumbnail_url='')
+        posts.update(thumbnails_pending=True)
+        queued = 0
+        for pk in posts.values_list('pk', flat=True).iterator():
+            tasks.generate_thumbnails.defer(pk)
+            queued += 1
+        self.stdout.write(f'Превью в очереди: {queued}')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс постов и комментариев'
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        backend = type(search.get_backend()).__name__
+        self.stdout.write(self.style.SUCCESS(f'Индекс перестроен ({backend})'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+from yatube.settings import SUGGESTIONS_MAX_COMMENTERS, SUGGESTIONS_PER_USER
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «кого почитать» для всех пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=SUGGESTIONS_PER_USER,
+            help='Сколько авторов сохранить каждому пользователю'
+        )
+        parser.add_argument(
+            '--max-commenters', type=int, default=SUGGESTIONS_MAX_COMMENTERS,
+            help='Посты с большим числом комментаторов не учитываются'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stored = recommendations.compute(
+            options['limit'], options['max_commenters']
+        )
+        self.stdout.write(
+            f'Сохранено рекомендаций: {stored} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from posts import timelines
+from posts.models import AuthorStats, Follow, Post
+
+User = get_user_model()
+
+FIELDS = ('posts_count', 'followers_count', 'following_count')
+
+
+def totals(queryset, field):
+    # order_by() убирает поля Meta.ordering из GROUP BY.
+    return dict(
+        queryset.order_by().values(field).annotate(
+            total=Count('pk')
+        ).values_list(field, 'total')
+    )
+
+
+class Command(BaseCommand):
+    help = 'Сверяет денормализованные счётчики с таблицами и исправляет их'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.reconcile_authors(dry_run)
+        self.reconcile_comments(dry_run)
+        if not dry_run:
+            self.reconcile_celebrities()
+
+    def reconcile_authors(self, dry_run):
+        actual = {
+            'posts_count': totals(Post.objects, 'author'),
+            'followers_count': totals(Follow.objects, 'author'),
+            'following_count': totals(Follow.objects, 'user'),
+        }
+        stored = {
+            stats.pk: stats for stats in AuthorStats.objects.iterator()
+        }
+        drifted = []
+        for user_id in User.objects.values_list('pk', flat=True).iterator():
+            expected = {
+                field: actual[field].get(user_id, 0) for field in FIELDS
+            }
+            stats = stored.get(user_id)
+            if stats is None:
+                if any(expected.values()):
+                    drifted.append(AuthorStats(user_id=user_id, **expected))
+                continue
+            if any(getattr(stats, field) != expected[field]
+                   for field in FIELDS):
+                for field in FIELDS:
+                    setattr(stats, field, expected[field])
+                drifted.append(stats)
+        self.stdout.write(f'Расхождений в счётчиках авторов: {len(drifted)}')
+        if dry_run:
+            return
+        AuthorStats.objects.bulk_create(
+            [stats for stats in drifted if stats.pk not in stored],
+            batch_size=500
+        )
+        AuthorStats.objects.bulk_update(
+            [stats for stats in drifted if stats.pk in stored],
+            FIELDS, batch_size=500
+        )
+
+    def reconcile_comments(self, dry_run):
+        drifted = Post.objects.annotate(
+            actual=Count('comments')
+        ).exclude(comments_count=F('actual')).values_list('pk', 'actual')
+        drifted = list(drifted)
+        self.stdout.write(
+            f'Расхождений в счётчиках комментариев: {len(drifted)}'
+        )
+        if dry_run:
+            return
+        for pk, actual in drifted:
+            Post.objects.filter(pk=pk).update(comments_count=actual)
+
+    def reconcile_celebrities(self):
+        demoted = timelines.refresh_celebrities()
+        for author_id in demoted:
+            timelines.backfill_followers(author_id)
+        self.stdout.write(f'Перестали быть знаменитостями: {len(demoted)}')
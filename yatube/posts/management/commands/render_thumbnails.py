@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Фоновый обработчик: считает превью картинок новых постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые посты'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди, секунд'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=50,
+            help='Сколько постов брать за один проход'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            post_ids = thumbnails.pending(options['batch'])
+            for post_id in post_ids:
+                try:
+                    thumbnails.generate(post_id)
+                except Exception as error:
+                    # Битая картинка: лента покажет оригинал.
+                    Post.objects.filter(pk=post_id).update(
+                        thumbnails_pending=False
+                    )
+                    self.stderr.write(f'Пост {post_id}: {error}')
+            if post_ids:
+                self.stdout.write(f'Обработано постов: {len(post_ids)}')
+            if not options['loop']:
+                return
+            if not post_ids:
+                time.sleep(options['interval'])
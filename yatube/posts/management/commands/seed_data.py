@@ -0,0 +1,160 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faker import Faker
+from mixer.backend.django import mixer
+
+from core.bulk import preserve_auto_now
+from posts import follow_graph
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+def power_law_weights(count, exponent):
+    """Накопленные веса Ципфа: k-й автор получает 1 / k ** exponent."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для бенчмарков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Среднее число подписок на пользователя'
+        )
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Показатель степенного закона популярности авторов'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Не пересчитывать счётчики, ленты и поисковый индекс'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.days = options['days']
+
+        user_ids = self.create_users(options['users'])
+        group_ids = self.create_groups(options['groups'])
+        # Популярность авторов распределена по степенному закону:
+        # немногие пишут и собирают подписчиков больше всех.
+        weights = power_law_weights(len(user_ids), options['exponent'])
+        post_ids = self.create_posts(
+            options['posts'], user_ids, weights, group_ids
+        )
+        self.create_comments(options['comments'], user_ids, post_ids)
+        self.create_follows(options['follows'], user_ids, weights)
+
+        if not options['skip_derived']:
+            call_command('reconcile_counters', stdout=self.stdout)
+            call_command('backfill_timelines', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+
+    def moment(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(self.days * 86400)
+        )
+
+    def batches(self, model, objects):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def create_users(self, count):
+        first = User.objects.count()
+        password = make_password(None)
+        self.batches(User, (
+            User(
+                username=f'bench{number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+            )
+            for number in range(first, first + count)
+        ))
+        self.stdout.write(f'Пользователей: {count}')
+        return list(User.objects.values_list('pk', flat=True))
+
+    def create_groups(self, count):
+        first = Group.objects.count()
+        groups = mixer.cycle(count).blend(
+            Group,
+            title=mixer.faker.sentence,
+            slug=(
+                f'bench-{number}' for number in range(first, first + count)
+            ),
+        ) if count else []
+        self.stdout.write(f'Групп: {count}')
+        return [group.pk for group in groups] + [None]
+
+    def create_posts(self, count, user_ids, weights, group_ids):
+        authors = self.random.choices(
+            user_ids, cum_weights=weights, k=count
+        )
+        with preserve_auto_now(Post):
+            self.batches(Post, (
+                Post(
+                    author_id=author_id,
+                    group_id=self.random.choice(group_ids),
+                    text=self.fake.text(max_nb_chars=400),
+                    pub_date=self.moment(),
+                )
+                for author_id in authors
+            ))
+        self.stdout.write(f'Постов: {count}')
+        return list(Post.objects.values_list('pk', flat=True))
+
+    def create_comments(self, count, user_ids, post_ids):
+        if not post_ids:
+            return
+        with preserve_auto_now(Comment):
+            self.batches(Comment, (
+                Comment(
+                    author_id=self.random.choice(user_ids),
+                    post_id=self.random.choice(post_ids),
+                    text=self.fake.sentence(),
+                    created=self.moment(),
+                )
+                for _ in range(count)
+            ))
+        self.stdout.write(f'Комментариев: {count}')
+
+    def create_follows(self, per_user, user_ids, weights):
+        def follows():
+            for user_id in user_ids:
+                authors = set(self.random.choices(
+                    user_ids, cum_weights=weights, k=per_user
+                ))
+                authors.discard(user_id)
+                for author_id in authors:
+                    yield Follow(user_id=user_id, author_id=author_id)
+        self.batches(Follow, follows())
+        follow_graph.reset()
+        self.stdout.write(f'Подписок: {Follow.objects.count()}')
@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+
+from core import replicas, singleflight
+
+from . import caching
+
+
+class AnonymousPageCacheMiddleware:
+    """Целые страницы лент для анонимов из кэша.
+
+    Страницы из PAGE_CACHE_VIEWS у всех анонимов одинаковы и зависят
+    только от адреса с query string. В ключ входят версии пространств
+    имён caching, поэтому сигналы записи сразу делают страницу
+    недостижимой. Промах рендерит один запрос на все процессы
+    (core.singleflight), остальные ждут готовую страницу до
+    PAGE_CACHE_WAIT секунд. Истёкшая страница ещё PAGE_CACHE_STALE
+    секунд отдаётся, пока её перерисовывает один запрос. Стоит после
+    AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        namespaces = settings.PAGE_CACHE_VIEWS.get(
+            request.resolver_match.view_name
+        )
+        # Пользователь читается только для кэшируемых страниц: API и
+        # прочие адреса не должны платить за сессию.
+        if namespaces is None or request.user.is_authenticated:
+            return None
+        return singleflight.cached(
+            page_key(request, namespaces, view_func, view_kwargs),
+            lambda: view_func(request, *view_args, **view_kwargs),
+            settings.PAGE_CACHE_TIMEOUT,
+            stale=settings.PAGE_CACHE_STALE,
+            wait=settings.PAGE_CACHE_WAIT,
+            store_if=cacheable,
+        )
+
+
+def page_key(request, namespaces, view_func, view_kwargs):
+    versions = caching.versions(
+        [namespace.format(**view_kwargs) for namespace in namespaces]
+    )
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    view_name = request.resolver_match.view_name
+    return ':'.join(
+        ['page', view_name, replicas.generation(view_func)]
+        + [str(version) for version in versions] + [path]
+    )
+
+
+def cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 500
+
+
+def fill_timelines(apps, schema_editor):
+    # Ленты существующих подписок собираются так же, как
+    # timelines.backfill: последние посты каждого автора.
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    recent = {}
+    entries = []
+    follows = Follow.objects.order_by('author_id').values_list(
+        'user_id', 'author_id'
+    )
+    for user_id, author_id in follows.iterator():
+        if author_id not in recent:
+            recent = {author_id: list(
+                Post.objects.filter(author_id=author_id)
+                .order_by('-pub_date', '-id')
+                .values_list('pk', 'pub_date')
+                [:settings.TIMELINE_BACKFILL_LIMIT]
+            )}
+        entries.extend(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in recent[author_id]
+        )
+        if len(entries) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0016_auto_20220816_2134'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date'], name='posts_timel_user_id_b48120_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together={('user', 'post')},
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
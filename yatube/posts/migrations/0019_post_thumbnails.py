@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+
+def queue_existing_images(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.exclude(image='').update(thumbnails_pending=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_srcset',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью для разных экранов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_url',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Превью'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails_pending',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Превью ждут пересчёта'),
+        ),
+        migrations.RunPython(queue_existing_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_celebrities(apps, schema_editor):
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    AuthorStats.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).update(is_celebrity=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_suggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='is_celebrity',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Знаменитость'),
+        ),
+        migrations.RunPython(mark_celebrities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,164 @@
+import re
+
+from django.db import migrations
+
+# Замороженные копии posts.stemmer и posts.search.tokenize: миграция
+# должна индексировать так же, даже когда модули изменятся.
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+     'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+     'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    (),
+    ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+     'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+     'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'),
+)
+SUPERLATIVE = ((), ('ейш', 'ейше'))
+DERIVATIONAL = ((), ('ост', 'ость'))
+
+CYRILLIC = re.compile('[а-я]')
+
+
+def _strip(word, start, groups):
+    """Отрезает самое длинное окончание, лежащее правее start.
+
+    Окончания первой группы должны стоять после «а» или «я».
+    """
+    best = None
+    for group, endings in enumerate(groups):
+        for ending in endings:
+            cut = len(word) - len(ending)
+            if cut < start or not word.endswith(ending):
+                continue
+            if group == 0 and (cut == start or word[cut - 1] not in 'ая'):
+                continue
+            if best is None or cut < best:
+                best = cut
+    if best is None:
+        return word, False
+    return word[:best], True
+
+
+def _region(word, start=0):
+    """Начало области после первой пары «гласная, согласная»."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC.search(word):
+        return word
+    rv = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        len(word)
+    )
+    r2 = _region(word, _region(word))
+
+    word, found = _strip(word, rv, PERFECTIVE_GERUND)
+    if not found:
+        word, _ = _strip(word, rv, REFLEXIVE)
+        stripped, found = _strip(word, rv, ADJECTIVE)
+        if found:
+            word, _ = _strip(stripped, rv, PARTICIPLE)
+        else:
+            word, found = _strip(word, rv, VERB)
+            if not found:
+                word, _ = _strip(word, rv, NOUN)
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    word, _ = _strip(word, r2, DERIVATIONAL)
+
+    if word.endswith('нн') and len(word) - 1 >= rv:
+        return word[:-1]
+    word, found = _strip(word, rv, SUPERLATIVE)
+    if found:
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+WORD = re.compile(r'\w+')
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'да', 'для', 'до', 'его', 'ее',
+    'её', 'же', 'за', 'и', 'из', 'или', 'им', 'их', 'к', 'как', 'ко', 'ли',
+    'на', 'над', 'не', 'нет', 'ни', 'но', 'о', 'об', 'от', 'по', 'под',
+    'при', 'с', 'со', 'так', 'то', 'у', 'уж', 'что', 'это', 'я', 'мы',
+    'ты', 'вы', 'он', 'она', 'оно', 'они',
+    'a', 'an', 'and', 'in', 'is', 'of', 'on', 'or', 'the', 'to',
+))
+
+
+def tokenize(text):
+    """Основы значимых слов текста в порядке следования."""
+    return [
+        stem(word)
+        for word in WORD.findall(text.lower())
+        if word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+def write(cursor, rowid, post_id, text):
+    body = ' '.join(tokenize(text))
+    if body:
+        cursor.execute(
+            'INSERT INTO posts_search (rowid, post_id, body) '
+            'VALUES (%s, %s, %s)',
+            [rowid, post_id, body]
+        )
+
+
+def rebuild_fts_table(apps, schema_editor):
+    # Строка на пост (rowid 2 * id) и на комментарий (2 * id + 1).
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DELETE FROM posts_search')
+        posts = Post.objects.values_list('pk', 'text')
+        for post_id, text in posts.iterator():
+            write(cursor, 2 * post_id, post_id, text)
+        comments = Comment.objects.values_list('pk', 'post_id', 'text')
+        for comment_id, post_id, text in comments.iterator():
+            write(cursor, 2 * comment_id + 1, post_id, text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_authorstats_is_celebrity'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_fts_table, migrations.RunPython.noop),
+    ]
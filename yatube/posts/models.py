@@ -15,6 +15,16 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа подтягиваются тем же запросом.
+
+        Число комментариев хранится в самом посте (comments_count),
+        поэтому страница ленты стоит фиксированное число запросов.
+        """
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -24,6 +34,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -44,9 +58,38 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnail_url = models.CharField(
+        'Превью',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    thumbnail_srcset = models.TextField(
+        'Превью для разных экранов',
+        blank=True,
+        editable=False,
+    )
+    thumbnails_pending = models.BooleanField(
+        'Превью ждут пересчёта',
+        default=False,
+        db_index=True,
+        editable=False,
+    )
+    comments_count = models.IntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['author', '-pub_date', '-id']),
+            models.Index(fields=['group', '-pub_date', '-id']),
+        ]
 
     def __str__(self):
         return self.text[:constants.STR_LENGTH]
@@ -72,6 +115,10 @@ class Comment(models.Model):
         related_name='comments'
     )
 
+    class Meta:
+        ordering = ['created', 'id']
+        indexes = [models.Index(fields=['post', 'created', 'id'])]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -87,3 +134,75 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('user', 'author')
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-pub_date']
+        unique_together = ('user', 'post')
+        indexes = [models.Index(fields=['user', '-pub_date', '-post'])]
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.IntegerField('Число постов', default=0)
+    followers_count = models.IntegerField('Число подписчиков', default=0)
+    following_count = models.IntegerField('Число подписок', default=0)
+    # Посты знаменитостей не раскладываются по лентам (posts.timelines).
+    is_celebrity = models.BooleanField(
+        'Знаменитость', default=False, db_index=True
+    )
+
+
+class Suggestion(models.Model):
+    """Автор, которого стоит почитать, из пакетного расчёта."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-score', 'author'])]
+
+
+class SearchPosting(models.Model):
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_postings'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='search_postings'
+    )
+    frequency = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['term', 'post'])]
@@ -1,10 +1,173 @@
-from django.core.paginator import Paginator
+import hashlib
+from datetime import datetime, timedelta
 
-from yatube.settings import POSTS_PER_PAGE
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils import timezone
 
+from core.singleflight import single_flight
 
-def paginator_context(queryset, request):
-    page_number = request.GET.get('page')
+from yatube.settings import CURSOR_FROM_PAGE, POSTS_PER_PAGE
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(moment, pk):
+    """Кодирует позицию (дата, id) в строку для параметра ?cursor=."""
+    delta = moment - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+    return f'{micros}_{pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает строку ?cursor=, для битой строки возвращает None."""
+    try:
+        micros, pk = (int(part) for part in cursor.split('_'))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + timedelta(microseconds=micros), pk
+
+
+class CursorPage(Page):
+    """Страница, открытая по курсору: без номера и без COUNT(*)."""
+
+    def __init__(self, object_list, paginator, next_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return True
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по паре (дата, id).
+
+    Поля ключа и направление берутся из сортировки queryset: посты
+    идут от новых к старым по (pub_date, id), лента подписок — по
+    копиям этих полей в записи ленты, комментарии — от старых к новым
+    по (created, id). Другая сортировка — ошибка конфигурации.
+    """
+
+    def keyset(self):
+        query = self.object_list.query
+        ordering = query.order_by or self.object_list.model._meta.ordering
+        ordering = list(ordering)
+        if (
+            len(ordering) != 2
+            or not all(isinstance(field, str) for field in ordering)
+            or len({field.startswith('-') for field in ordering}) != 1
+            or any('__' in field or field.lstrip('-') in ('', '?')
+                   for field in ordering)
+        ):
+            raise ImproperlyConfigured(
+                'CursorPaginator нужна сортировка по двум полям модели '
+                f'(дата, id) в одном направлении, а не {ordering!r}'
+            )
+        descending = ordering[0].startswith('-')
+        return [field.lstrip('-') for field in ordering], descending
+
+    def page_after(self, cursor):
+        position = decode_cursor(cursor)
+        (date_field, id_field), descending = self.keyset()
+        queryset = self.object_list
+        if position is not None:
+            moment, pk = position
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__{lookup}': moment})
+                | Q(**{date_field: moment, f'{id_field}__{lookup}': pk})
+            )
+        objects = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(objects) > self.per_page:
+            objects = objects[:self.per_page]
+            last = objects[-1]
+            next_cursor = encode_cursor(
+                getattr(last, date_field), getattr(last, id_field)
+            )
+        return CursorPage(objects, self, next_cursor)
+
+
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, None на месте пропуска."""
+    number = page_obj.number
+    num_pages = page_obj.paginator.num_pages
+    shown = set(range(1, min(on_ends, num_pages) + 1))
+    shown |= set(range(max(1, num_pages - on_ends + 1), num_pages + 1))
+    shown |= set(range(
+        max(1, number - on_each_side),
+        min(num_pages, number + on_each_side) + 1
+    ))
+    page_range = []
+    for page in sorted(shown):
+        if page_range and page - page_range[-1] > 1:
+            page_range.append(None)
+        page_range.append(page)
+    return page_range
+
+
+def page_flight_key(queryset, request, count=None):
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return None
+    # queryset.db учитывает роутер: реплика может отставать от default.
+    params = (
+        queryset.db, request.GET.get('cursor'), request.GET.get('page'), count
+    )
+    return 'paginator:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+
+
+def numbered_page(queryset, page_number, count=None):
     paginator = Paginator(queryset, POSTS_PER_PAGE)
+    if count is not None:
+        paginator.count = count
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+def short_page(queryset, page_obj, page_number):
+    """Неполная страница при числе из кэша, которое могло устареть.
+
+    После неё постов нет: число уточняется по ней самой. Пустая страница
+    после первой лежит за концом ленты — тогда число считается заново.
+    """
+    if not page_obj.object_list and page_obj.number > 1:
+        return numbered_page(queryset, page_number)
+    paginator = Paginator(queryset, POSTS_PER_PAGE)
+    paginator.count = (
+        (page_obj.number - 1) * POSTS_PER_PAGE + len(page_obj.object_list)
+    )
+    return Page(page_obj.object_list, page_obj.number, paginator)
+
+
+@single_flight(page_flight_key)
+def paginator_context(queryset, request, count=None):
+    """Страница по ?page= или ?cursor=.
+
+    count — уже известное число объектов, например из кэша
+    posts.counts: тогда пагинатор не делает COUNT(*). Одновременные
+    запросы одной и той же страницы в процессе читают базу один раз
+    и получают общую страницу, её нельзя менять.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return CursorPaginator(queryset, POSTS_PER_PAGE).page_after(cursor)
+    page_number = request.GET.get('page')
+    page_obj = numbered_page(queryset, page_number, count)
+    if count is not None and len(page_obj.object_list) < POSTS_PER_PAGE:
+        page_obj = short_page(queryset, page_obj, page_number)
+    page_obj.page_range = elided_page_range(page_obj)
+    page_obj.next_cursor = None
+    if (
+        page_obj.object_list and page_obj.has_next()
+        and page_obj.number >= CURSOR_FROM_PAGE
+    ):
+        last = page_obj.object_list[-1]
+        page_obj.next_cursor = encode_cursor(last.pub_date, last.pk)
     return page_obj
@@ -0,0 +1,133 @@
+"""Пакетный расчёт рекомендаций «кого почитать».
+
+Кандидаты для пользователя — авторы, на которых подписаны его
+подписки (друзья друзей), и те, кто комментирует те же посты, что и
+он. Это строки произведений разреженных матриц F·F и C·Cᵀ, где F —
+матрица подписок, C — пользователи × посты с комментариями. Матрицы
+хранятся словарями списков id и перемножаются строка за строкой, так
+что в памяти только сами таблицы и одна строка результата.
+
+Для каждого пользователя сохраняются SUGGESTIONS_PER_USER лучших
+авторов в таблицу Suggestion, читать их — один запрос по индексу
+(user, -score).
+"""
+import heapq
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from yatube.settings import SUGGESTIONS_MAX_COMMENTERS, SUGGESTIONS_PER_USER
+
+from . import follow_graph
+from .models import Comment, Follow, Post, Suggestion
+
+User = get_user_model()
+
+FOLLOW_WEIGHT = 1.0
+COMMENT_WEIGHT = 0.5
+BATCH_SIZE = 1000
+
+
+def _rows(pairs):
+    """Строки разреженной матрицы из пар (строка, столбец)."""
+    rows = {}
+    for row, column in pairs:
+        rows.setdefault(row, []).append(column)
+    return rows
+
+
+def load_matrices(max_commenters=SUGGESTIONS_MAX_COMMENTERS):
+    """Подписки, комментаторы постов и посты каждого комментатора."""
+    following = _rows(
+        Follow.objects.values_list('user_id', 'author_id')
+        .order_by('user_id', 'author_id').iterator()
+    )
+    commented = Comment.objects.order_by().values_list(
+        'post_id', 'author_id'
+    ).distinct()
+    commenters = _rows(commented.iterator())
+    # У популярных постов сотни комментаторов: пар из них слишком
+    # много, а сигнала о сходстве вкусов почти нет.
+    commenters = {
+        post_id: users for post_id, users in commenters.items()
+        if len(users) <= max_commenters
+    }
+    posts_by_user = _rows(
+        (user_id, post_id)
+        for post_id, users in commenters.items() for user_id in users
+    )
+    return following, commenters, posts_by_user
+
+
+def candidates(user_id, following, commenters, posts_by_user):
+    """Строка F·F + C·Cᵀ для user_id: {автор: вес}."""
+    scores = Counter()
+    for author_id in following.get(user_id, ()):
+        for candidate in following.get(author_id, ()):
+            scores[candidate] += FOLLOW_WEIGHT
+    for post_id in posts_by_user.get(user_id, ()):
+        for candidate in commenters[post_id]:
+            scores[candidate] += COMMENT_WEIGHT
+    return scores
+
+
+def top_authors(user_id, scores, followed, authors,
+                limit=SUGGESTIONS_PER_USER):
+    """Лучшие limit авторов без себя и уже прочитанных."""
+    return heapq.nsmallest(
+        limit,
+        (
+            (-score, author_id) for author_id, score in scores.items()
+            if author_id in authors and author_id != user_id
+            and author_id not in followed
+        ),
+    )
+
+
+def compute(limit=SUGGESTIONS_PER_USER,
+            max_commenters=SUGGESTIONS_MAX_COMMENTERS):
+    """Пересчитывает рекомендации всех пользователей, возвращает число."""
+    following, commenters, posts_by_user = load_matrices(max_commenters)
+    authors = set(
+        Post.objects.order_by().values_list('author_id', flat=True)
+        .distinct()
+    )
+    user_ids = list(
+        User.objects.order_by('pk').values_list('pk', flat=True)
+    )
+    stored = 0
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        suggestions = []
+        for user_id in batch:
+            scores = candidates(
+                user_id, following, commenters, posts_by_user
+            )
+            followed = set(following.get(user_id, ()))
+            suggestions.extend(
+                Suggestion(user_id=user_id, author_id=author_id,
+                           score=-score)
+                for score, author_id in top_authors(
+                    user_id, scores, followed, authors, limit
+                )
+            )
+        with transaction.atomic():
+            Suggestion.objects.filter(user_id__in=batch).delete()
+            Suggestion.objects.bulk_create(suggestions, batch_size=500)
+        stored += len(suggestions)
+    return stored
+
+
+def suggestions_for(user, limit=SUGGESTIONS_PER_USER):
+    """Сохранённые рекомендации без авторов, на которых уже подписан.
+
+    Подписки после расчёта отсекает граф follow_graph в памяти.
+    """
+    suggested = Suggestion.objects.filter(user=user).select_related(
+        'author'
+    ).order_by('-score', 'author')[:limit]
+    return [
+        suggestion.author for suggestion in suggested
+        if not follow_graph.is_following(user.pk, suggestion.author_id)
+    ]
@@ -0,0 +1,216 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+Текст разбивается на слова, слова приводятся к основе стеммером
+Портера, и основы попадают в индекс. На SQLite индексом служит
+виртуальная таблица FTS5 posts_search с ранжированием bm25, на других
+базах — таблица SearchPosting, по которой ранжирование tf-idf
+считается в Python. В обоих индексах пост ищется вместе со своими
+комментариями: слова запроса могут быть и в тексте, и в комментариях.
+Индекс обновляется сигналами при сохранении и удалении постов и
+комментариев, каждая запись меняет только свои строки.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+
+from . import counts
+from .models import Comment, Post, SearchPosting
+from .stemmer import stem
+
+WORD = re.compile(r'\w+')
+MAX_RESULTS = 1000
+DELETE_ROW = 'DELETE FROM posts_search WHERE rowid = %s'
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'да', 'для', 'до', 'его', 'ее',
+    'её', 'же', 'за', 'и', 'из', 'или', 'им', 'их', 'к', 'как', 'ко', 'ли',
+    'на', 'над', 'не', 'нет', 'ни', 'но', 'о', 'об', 'от', 'по', 'под',
+    'при', 'с', 'со', 'так', 'то', 'у', 'уж', 'что', 'это', 'я', 'мы',
+    'ты', 'вы', 'он', 'она', 'оно', 'они',
+    'a', 'an', 'and', 'in', 'is', 'of', 'on', 'or', 'the', 'to',
+))
+
+
+def tokenize(text):
+    """Основы значимых слов текста в порядке следования."""
+    return [
+        stem(word)
+        for word in WORD.findall(text.lower())
+        if word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+def _post_row(post_id):
+    return 2 * post_id
+
+
+def _comment_row(comment_id):
+    return 2 * comment_id + 1
+
+
+class Fts5Backend:
+    """Индекс в таблице FTS5: строка на пост и на каждый комментарий.
+
+    rowid строки поста — 2 * id, комментария — 2 * id + 1: строку можно
+    заменить или удалить без поиска по таблице, и комментарий
+    переписывает только свою строку. Пост найден, если каждое слово
+    запроса есть в его тексте или комментариях; ранг поста — сумма
+    bm25 его строк.
+    """
+
+    def _write(self, rowid, post_id, text):
+        body = ' '.join(tokenize(text))
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_ROW, [rowid])
+            if body:
+                cursor.execute(
+                    'INSERT INTO posts_search (rowid, post_id, body) '
+                    'VALUES (%s, %s, %s)',
+                    [rowid, post_id, body]
+                )
+
+    def _delete(self, rowid):
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_ROW, [rowid])
+
+    def index_post(self, post):
+        self._write(_post_row(post.pk), post.pk, post.text)
+
+    def index_comment(self, comment):
+        self._write(
+            _comment_row(comment.pk), comment.post_id, comment.text
+        )
+
+    def remove_post(self, post):
+        # Строки комментариев удаляют сигналы каскадного удаления.
+        self._delete(_post_row(post.pk))
+
+    def remove_comment(self, comment):
+        self._delete(_comment_row(comment.pk))
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM posts_search')
+
+    def rebuild(self):
+        self.clear()
+        posts = Post.objects.values_list('pk', 'text')
+        for post_id, text in posts.iterator():
+            self._write(_post_row(post_id), post_id, text)
+        comments = Comment.objects.values_list('pk', 'post_id', 'text')
+        for comment_id, post_id, text in comments.iterator():
+            self._write(_comment_row(comment_id), post_id, text)
+
+    def search(self, terms, limit=MAX_RESULTS):
+        terms = list(dict.fromkeys(terms))
+        sql = [
+            'SELECT post_id FROM posts_search WHERE posts_search MATCH %s'
+        ]
+        params = [' OR '.join(f'"{term}"' for term in terms)]
+        if len(terms) > 1:
+            # Слова запроса могут быть в разных строках одного поста.
+            for term in terms:
+                sql.append(
+                    'AND post_id IN (SELECT post_id FROM posts_search '
+                    'WHERE posts_search MATCH %s)'
+                )
+                params.append(f'"{term}"')
+        # LIMIT -1 в SQLite — без ограничения.
+        sql.append('GROUP BY post_id ORDER BY SUM(rank), post_id LIMIT %s')
+        params.append(-1 if limit is None else limit)
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """Обратный индекс в таблице SearchPosting с ранжированием tf-idf."""
+
+    def _write(self, post_id, comment_id, text):
+        SearchPosting.objects.filter(
+            post_id=post_id, comment_id=comment_id
+        ).delete()
+        SearchPosting.objects.bulk_create([
+            SearchPosting(
+                term=term[:64],
+                post_id=post_id,
+                comment_id=comment_id,
+                frequency=frequency,
+            )
+            for term, frequency in Counter(tokenize(text)).items()
+        ])
+
+    def index_post(self, post):
+        self._write(post.pk, None, post.text)
+
+    def index_comment(self, comment):
+        self._write(comment.post_id, comment.pk, comment.text)
+
+    def remove_post(self, post):
+        SearchPosting.objects.filter(
+            post_id=post.pk, comment_id=None
+        ).delete()
+
+    def remove_comment(self, comment):
+        SearchPosting.objects.filter(comment_id=comment.pk).delete()
+
+    def clear(self):
+        SearchPosting.objects.all().delete()
+
+    def rebuild(self):
+        self.clear()
+        for post in Post.objects.only('pk', 'text').iterator():
+            self.index_post(post)
+        comments = Comment.objects.only('pk', 'post_id', 'text')
+        for comment in comments.iterator():
+            self.index_comment(comment)
+
+    def search(self, terms, limit=MAX_RESULTS):
+        terms = set(terms)
+        postings = SearchPosting.objects.filter(
+            term__in=terms
+        ).values_list('term', 'post_id', 'frequency')
+        matches = defaultdict(Counter)
+        for term, post_id, frequency in postings.iterator():
+            matches[term][post_id] += frequency
+        if set(matches) != terms:
+            return []
+        # Для idf хватает приблизительного числа постов из кэша.
+        total = max(counts.post_count('posts'), 1)
+        scores = Counter()
+        for post_ids in matches.values():
+            idf = math.log(1 + total / len(post_ids))
+            for post_id, frequency in post_ids.items():
+                scores[post_id] += (1 + math.log(frequency)) * idf
+        found = set.intersection(*(set(ids) for ids in matches.values()))
+        ranked = sorted(found, key=lambda post_id: -scores[post_id])
+        return ranked[:limit]
+
+
+_backend = None
+
+
+def get_backend():
+    """FTS5 на SQLite, где он есть, иначе индекс на Python."""
+    global _backend
+    if _backend is None:
+        _backend = InvertedIndexBackend()
+        if connection.vendor == 'sqlite':
+            if 'posts_search' in connection.introspection.table_names():
+                _backend = Fts5Backend()
+    return _backend
+
+
+def search(query, limit=MAX_RESULTS):
+    """id постов по запросу, от самых подходящих; limit=None — все."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    return get_backend().search(terms, limit)
+
+
+def rebuild():
+    """Переиндексирует все посты и комментарии."""
+    with transaction.atomic():
+        get_backend().rebuild()
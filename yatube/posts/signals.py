@@ -0,0 +1,181 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, counters, follow_graph, search, tasks, timelines
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, **kwargs):
+    instance._old_group_slug = None
+    if instance.pk:
+        instance._old_group_slug = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group__slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        tasks.fan_out_post.defer(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def render_thumbnails(sender, instance, **kwargs):
+    if instance.thumbnails_pending:
+        tasks.generate_thumbnails.defer(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    namespaces = caching.post_namespaces(instance)
+    old_group_slug = getattr(instance, '_old_group_slug', None)
+    if old_group_slug:
+        namespaces.append(f'group:{old_group_slug}')
+    caching.bump(*namespaces)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    caching.bump('posts', f'group:{instance.slug}')
+
+
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_old_name(sender, instance, update_fields, **kwargs):
+    instance._old_name = None
+    # Вход на сайт сохраняет только last_login: лишний запрос не нужен.
+    if update_fields is not None and update_fields.isdisjoint(
+        AUTHOR_NAME_FIELDS
+    ):
+        return
+    if instance.pk:
+        instance._old_name = User.objects.filter(
+            pk=instance.pk
+        ).values_list(*AUTHOR_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, **kwargs):
+    # Из полей автора на страницах лент видно только имя. Ключи
+    # карточек постов содержат его сами.
+    old_name = getattr(instance, '_old_name', None)
+    new_name = tuple(getattr(instance, field) for field in AUTHOR_NAME_FIELDS)
+    if created or old_name is None or old_name == new_name:
+        return
+    slugs = Group.objects.filter(posts__author=instance).distinct()
+    caching.bump(
+        'posts', f'profile:{old_name[0]}', f'profile:{instance.username}',
+        *(f'group:{slug}' for slug in slugs.values_list('slug', flat=True))
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    caching.bump(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        tasks.backfill_timeline.defer(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clean_timeline(sender, instance, **kwargs):
+    timelines.remove(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def add_follow_edge(sender, instance, created, **kwargs):
+    if created:
+        follow_graph.followed(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow_edge(sender, instance, **kwargs):
+    follow_graph.unfollowed(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_profile_page(sender, instance, **kwargs):
+    caching.bump(
+        f'profile:{instance.author.username}', f'follow:{instance.user_id}'
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        counters.change(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.change(instance.author_id, followers_count=1)
+        counters.change(instance.user_id, following_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.change(instance.author_id, followers_count=-1)
+    counters.change(instance.user_id, following_count=-1)
+
+
+def refresh_celebrity(author_id):
+    for demoted in timelines.refresh_celebrities([author_id]):
+        tasks.backfill_followers.defer(demoted)
+
+
+@receiver(post_save, sender=Follow)
+def promote_celebrity(sender, instance, created, **kwargs):
+    if created:
+        refresh_celebrity(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def demote_celebrity(sender, instance, **kwargs):
+    refresh_celebrity(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.change_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    tasks.index_post.defer(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    tasks.index_comment.defer(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.get_backend().remove_comment(instance)
@@ -0,0 +1,103 @@
+"""Стеммер Портера (Snowball) для русского языка."""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+     'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+     'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    (),
+    ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+     'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+     'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'),
+)
+SUPERLATIVE = ((), ('ейш', 'ейше'))
+DERIVATIONAL = ((), ('ост', 'ость'))
+
+CYRILLIC = re.compile('[а-я]')
+
+
+def _strip(word, start, groups):
+    """Отрезает самое длинное окончание, лежащее правее start.
+
+    Окончания первой группы должны стоять после «а» или «я».
+    """
+    best = None
+    for group, endings in enumerate(groups):
+        for ending in endings:
+            cut = len(word) - len(ending)
+            if cut < start or not word.endswith(ending):
+                continue
+            if group == 0 and (cut == start or word[cut - 1] not in 'ая'):
+                continue
+            if best is None or cut < best:
+                best = cut
+    if best is None:
+        return word, False
+    return word[:best], True
+
+
+def _region(word, start=0):
+    """Начало области после первой пары «гласная, согласная»."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC.search(word):
+        return word
+    rv = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        len(word)
+    )
+    r2 = _region(word, _region(word))
+
+    word, found = _strip(word, rv, PERFECTIVE_GERUND)
+    if not found:
+        word, _ = _strip(word, rv, REFLEXIVE)
+        stripped, found = _strip(word, rv, ADJECTIVE)
+        if found:
+            word, _ = _strip(stripped, rv, PARTICIPLE)
+        else:
+            word, found = _strip(word, rv, VERB)
+            if not found:
+                word, _ = _strip(word, rv, NOUN)
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    word, _ = _strip(word, r2, DERIVATIONAL)
+
+    if word.endswith('нн') and len(word) - 1 >= rv:
+        return word[:-1]
+    word, found = _strip(word, rv, SUPERLATIVE)
+    if found:
+        if word.endswith('нн'):
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
@@ -0,0 +1,52 @@
+"""Фоновые задачи постов, выполняются воркером core.jobs."""
+from core.jobs import task
+
+from . import counts, search, thumbnails, timelines
+from .models import Comment, Follow, Post
+
+
+@task
+def fan_out_post(post_id):
+    post = Post.objects.only('pk', 'author_id', 'pub_date').filter(
+        pk=post_id
+    ).first()
+    if post is not None:
+        timelines.fan_out(post)
+
+
+@task
+def backfill_timeline(user_id, author_id):
+    # Пока задача ждала, пользователь мог успеть отписаться.
+    if Follow.objects.filter(user_id=user_id, author_id=author_id).exists():
+        timelines.backfill(user_id, author_id)
+
+
+@task
+def backfill_followers(author_id):
+    timelines.backfill_followers(author_id)
+
+
+@task
+def index_post(post_id):
+    post = Post.objects.only('pk', 'text').filter(pk=post_id).first()
+    if post is not None:
+        search.get_backend().index_post(post)
+
+
+@task
+def index_comment(comment_id):
+    comment = Comment.objects.only('pk', 'post_id', 'text').filter(
+        pk=comment_id
+    ).first()
+    if comment is not None:
+        search.get_backend().index_comment(comment)
+
+
+@task(max_attempts=3)
+def generate_thumbnails(post_id):
+    thumbnails.generate(post_id)
+
+
+@task
+def refresh_post_count(name, filters):
+    counts.refresh(name, filters)
@@ -0,0 +1,97 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Comment, Follow, Group, Post
+from yatube.settings import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {number}')
+            for number in range(POSTS_PER_PAGE + 3)
+        )
+        # Подписка после постов: лента заполняется из уже написанных.
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.first()
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_feeds(self):
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_posts', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                self.assertEqual(len(first['results']), POSTS_PER_PAGE)
+                self.assertEqual(first['results'][0]['id'], self.post.pk)
+                rest = self.client.get(
+                    url, {'cursor': first['next_cursor']}
+                ).json()
+                self.assertEqual(len(rest['results']), 3)
+                self.assertIsNone(rest['next_cursor'])
+
+    def test_post_detail(self):
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=[self.post.pk])
+        ).json()
+        self.assertEqual(data['post']['text'], self.post.text)
+        self.assertEqual(data['post']['comments_count'], 1)
+        self.assertEqual(data['comments'][0]['text'], 'Комментарий')
+
+    def test_field_selection(self):
+        url = reverse('posts:api_index')
+        data = self.client.get(url, {'fields': 'id,author'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        url = reverse('posts:api_index')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Правка не меняет pub_date, но поднимает версию кэша.
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Правка'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since_alone_gets_fresh_data(self):
+        """Без ETag правка не прячется за 304 по дате поста."""
+        url = reverse('posts:api_index')
+        since = http_date(time.time() + 60)
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_etag_changes_on_unfollow(self):
+        url = reverse('posts:api_follow_index')
+        etag = self.client.get(url)['ETag']
+        Follow.objects.filter(user=self.reader).delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import benchmark
+from posts.models import Follow, Post
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 0.5), 50.5)
+        self.assertAlmostEqual(benchmark.percentile(values, 0.99), 99.01)
+
+    def test_compare_finds_regressions(self):
+        baseline = {'results': {'index': {'p50_ms': 10.0}}}
+        current = {'results': {'index': {'p50_ms': 12.0}}}
+        self.assertEqual(
+            benchmark.compare(baseline, current), {'index': (10.0, 12.0)}
+        )
+        self.assertEqual(benchmark.compare(current, baseline), {})
+
+    def test_seed_twice(self):
+        """Повторный запуск дополняет базу, а не падает на slug."""
+        for _ in range(2):
+            call_command(
+                'seed_data', users=3, groups=2, posts=4, comments=2,
+                follows=1, stdout=StringIO()
+            )
+        self.assertEqual(Post.objects.count(), 8)
+
+    def test_seed_and_benchmark(self):
+        """Команды наполняют базу и пишут машиночитаемый отчёт."""
+        call_command(
+            'seed_data', users=10, groups=2, posts=40, comments=20,
+            follows=3, stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 40)
+        self.assertTrue(Follow.objects.exists())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.json')
+            call_command(
+                'benchmark_views', runs=2, warmup=0, output=path,
+                stdout=StringIO()
+            )
+            with open(path, encoding='utf-8') as file:
+                report = json.load(file)
+        self.assertEqual(report['meta']['posts'], 40)
+        for result in report['results'].values():
+            self.assertGreater(result['queries'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from yatube.settings import COMMENTS_PER_PAGE
+
+User = get_user_model()
+
+EXTRA = 5
+
+
+class CommentsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {n}')
+            for n in range(COMMENTS_PER_PAGE + EXTRA)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:post_comments', args=[self.post.pk])
+
+    def test_post_detail_renders_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertIsNotNone(comments.next_cursor)
+        self.assertContains(response, 'more-comments')
+
+    def test_json_pages_cover_all_comments(self):
+        first = self.client.get(self.url).json()
+        self.assertEqual(len(first['comments']), COMMENTS_PER_PAGE)
+        second = self.client.get(
+            self.url, {'cursor': first['next_cursor']}
+        ).json()
+        self.assertEqual(len(second['comments']), EXTRA)
+        self.assertIsNone(second['next_cursor'])
+        ids = [
+            comment['id']
+            for comment in first['comments'] + second['comments']
+        ]
+        self.assertEqual(
+            ids, list(Comment.objects.values_list('pk', flat=True))
+        )
+        self.assertIn('Комментарий 0', first['comments'][0]['html'])
+
+    def test_unknown_post(self):
+        response = self.client.get(
+            reverse('posts:post_comments', args=[self.post.pk + 1])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_ajax_comment_returns_rendered_comment(self):
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Новый'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['text'], 'Новый')
+        self.assertIn('data-comment-id="%d"' % data['id'], data['html'])
+
+    def test_ajax_invalid_comment(self):
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': ''},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from posts.counters import stats_for
+from posts.models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Counted')
+        cls.reader = User.objects.create_user(username='Counter')
+
+    def get_stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_post_counter_follows_writes(self):
+        """Счётчик постов растёт при создании и падает при удалении."""
+        post = Post.objects.create(author=self.author, text='One')
+        Post.objects.create(author=self.author, text='Two')
+        self.assertEqual(self.get_stats(self.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.get_stats(self.author).posts_count, 1)
+
+    def test_follow_counters(self):
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.get_stats(self.author).followers_count, 1)
+        self.assertEqual(self.get_stats(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.get_stats(self.author).followers_count, 0)
+        self.assertEqual(self.get_stats(self.reader).following_count, 0)
+
+    def test_comment_counter(self):
+        post = Post.objects.create(author=self.author, text='Discussed')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='First'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_stats_created_lazily(self):
+        """Без строки счётчиков она считается по таблицам."""
+        Post.objects.create(author=self.author, text='Lazy')
+        AuthorStats.objects.all().delete()
+        self.assertEqual(stats_for(self.author).posts_count, 1)
+
+    def test_reconcile_fixes_drift(self):
+        for number in range(3):
+            post = Post.objects.create(author=self.author, text=f'{number}')
+        Post.objects.create(author=self.reader, text='Чужой')
+        AuthorStats.objects.filter(user=self.author).update(posts_count=42)
+        Post.objects.filter(pk=post.pk).update(comments_count=7)
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(self.get_stats(self.author).posts_count, 3)
+        self.assertEqual(self.get_stats(self.reader).posts_count, 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
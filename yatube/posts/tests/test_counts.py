@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import counts
+from posts.models import Post
+from posts.pagination import elided_page_range
+from yatube.settings import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class PostCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        self.posts[0].delete()
+
+    @override_settings(JOBS_EAGER=False)
+    def test_estimate_until_refreshed(self):
+        self.assertEqual(counts.post_count('posts'), self.posts[-1].pk)
+        counts.refresh('posts', {})
+        self.assertEqual(counts.post_count('posts'), 2)
+
+    def test_stale_count_is_served_until_refresh(self):
+        self.assertEqual(counts.post_count('posts'), 2)
+        Post.objects.create(author=self.author, text='Новый')
+        self.assertEqual(counts.post_count('posts'), 2)
+        key = counts.COUNT_KEY.format('posts')
+        cache.set(key, (2, 0), None)
+        cache.delete(counts.REFRESH_KEY.format('posts'))
+        self.assertEqual(counts.post_count('posts'), 3)
+
+    def test_group_count_is_exact(self):
+        self.assertEqual(
+            counts.post_count('group:none', group_id=None), 2
+        )
+
+    def test_profile_counts_pages_by_stats(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+
+
+@override_settings(JOBS_EAGER=False)
+class EstimatedCountPagesTest(TestCase):
+    """Главная, пока вместо числа постов — наибольший id."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        posts = [
+            Post.objects.create(author=author, text=f'Пост {number}')
+            for number in range(4 * POSTS_PER_PAGE)
+        ]
+        # Половина постов удалена: id больше числа постов вдвое.
+        for post in posts[::2]:
+            post.delete()
+        cls.last_page = 2
+
+    def setUp(self):
+        cache.clear()
+
+    def page(self, number):
+        with mock.patch('posts.pagination.CURSOR_FROM_PAGE', 1):
+            response = self.client.get(
+                reverse('posts:home_page'), {'page': number}
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_pages_past_the_end_show_the_last_page(self):
+        for number in (self.last_page + 1, 4):
+            with self.subTest(page=number):
+                page = self.page(number)
+                self.assertEqual(page.number, self.last_page)
+                self.assertFalse(page.has_next())
+                self.assertEqual(page.paginator.num_pages, self.last_page)
+
+    def test_short_page_is_the_last(self):
+        Post.objects.order_by('pk').first().delete()
+        page = self.page(self.last_page)
+        self.assertEqual(len(page), POSTS_PER_PAGE - 1)
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+        self.assertEqual(page.paginator.num_pages, self.last_page)
+
+
+class ElidedPageRangeTest(TestCase):
+    def page(self, number, num_pages):
+        return SimpleNamespace(
+            number=number, paginator=SimpleNamespace(num_pages=num_pages)
+        )
+
+    def test_short_range_is_complete(self):
+        self.assertEqual(elided_page_range(self.page(2, 4)), [1, 2, 3, 4])
+
+    def test_long_range_is_elided(self):
+        self.assertEqual(
+            elided_page_range(self.page(50, 100000)),
+            [1, None, 48, 49, 50, 51, 52, None, 100000]
+        )
+        self.assertEqual(
+            elided_page_range(self.page(1, 100000)),
+            [1, 2, 3, None, 100000]
+        )
@@ -0,0 +1,101 @@
+import time
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import caching
+from posts.feeds import follow_feed_token
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class FeedsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(3):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост <{number}>'
+            )
+
+    def setUp(self):
+        self.client = Client()
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return ElementTree.fromstring(b''.join(response.streaming_content))
+
+    def test_atom_feeds(self):
+        urls = (
+            reverse('posts:group_feed', args=[self.group.slug]),
+            reverse('posts:profile_feed', args=[self.author.username]),
+            reverse('posts:follow_feed', args=[
+                follow_feed_token(self.reader)
+            ]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                feed = self.read(self.client.get(url))
+                entries = feed.findall(f'{ATOM}entry')
+                self.assertEqual(len(entries), 3)
+                self.assertEqual(
+                    entries[0].find(f'{ATOM}summary').text, 'Пост <2>'
+                )
+
+    def test_rss(self):
+        response = self.client.get(
+            reverse('posts:group_feed', args=[self.group.slug]),
+            {'format': 'rss'}
+        )
+        self.assertIn('rss', response['Content-Type'])
+        feed = self.read(response)
+        self.assertEqual(len(feed.findall('channel/item')), 3)
+
+    def test_etag(self):
+        url = reverse('posts:profile_feed', args=[self.author.username])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Правка не меняет дату самого нового поста.
+        post = self.author.posts.last()
+        post.text = 'Правка'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified(self):
+        url = reverse('posts:profile_feed', args=[self.author.username])
+        namespace = f'profile:{self.author.username}'
+        cache.set(caching.CHANGED_KEY.format(namespace), time.time() - 60)
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        # Удаление не меняет дату самого нового поста.
+        self.author.posts.last().delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        # Только что изменённой ленте дата не ставится.
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_password_change_revokes_token(self):
+        reader = User.objects.get(pk=self.reader.pk)
+        url = reverse('posts:follow_feed', args=[follow_feed_token(reader)])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        reader.set_password('новый пароль')
+        reader.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_bad_token(self):
+        response = self.client.get(
+            reverse('posts:follow_feed', args=['forged'])
+        )
+        self.assertEqual(response.status_code, 404)
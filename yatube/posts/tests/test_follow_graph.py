@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase
+
+from posts import caching, follow_graph
+from posts.follow_graph import FollowGraph
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTest(SimpleTestCase):
+    def setUp(self):
+        self.graph = FollowGraph(1, [
+            (1, 2), (1, 3), (2, 1), (2, 4), (3, 4), (3, 5), (4, 5),
+        ])
+
+    def test_lookups(self):
+        self.assertTrue(self.graph.is_following(1, 3))
+        self.assertFalse(self.graph.is_following(3, 1))
+        self.assertEqual(self.graph.followees(3), [4, 5])
+        self.assertEqual(self.graph.followers_of(5), [3, 4])
+        self.assertEqual(self.graph.followees(10), [])
+
+    def test_mutuals(self):
+        self.assertEqual(self.graph.mutuals(1), [2])
+        self.assertEqual(self.graph.mutuals(3), [])
+
+    def test_suggestions_rank_by_shared_follows(self):
+        self.assertEqual(self.graph.suggestions(1), [4, 5])
+        self.assertEqual(self.graph.suggestions(1, limit=1), [4])
+        self.assertEqual(self.graph.suggestions(5), [])
+
+    def test_add_and_remove_keep_arrays_sorted(self):
+        self.graph.add(5, 3)
+        self.graph.add(5, 1)
+        self.graph.add(5, 3)
+        self.assertEqual(self.graph.followees(5), [1, 3])
+        self.assertEqual(self.graph.followers_of(3), [1, 5])
+        self.graph.remove(5, 3)
+        self.graph.remove(5, 3)
+        self.assertEqual(self.graph.followees(5), [1])
+        self.assertEqual(self.graph.followers_of(3), [1])
+
+
+class FollowGraphSyncTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+
+    def test_graph_is_loaded_once_and_updated_on_follow(self):
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+            self.assertEqual(
+                follow_graph.followers(self.author.pk), [self.reader.pk]
+            )
+        follow.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(follow_graph.followees(self.reader.pk), [])
+
+    def test_bulk_write_reloads_graph(self):
+        follow_graph.get_graph()
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.author)]
+        )
+        follow_graph.reset()
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+
+    def test_other_process_change_comes_from_log(self):
+        graph = follow_graph.get_graph()
+        # Подписка только записана в журнал, как если бы её сделал
+        # другой процесс.
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertFalse(graph.is_following(self.reader.pk, self.author.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+        self.assertIs(follow_graph.get_graph(), graph)
+
+    def test_missing_log_entry_reloads_graph(self):
+        follow_graph.get_graph()
+        Follow.objects.create(user=self.reader, author=self.author)
+        version = caching.versions([follow_graph.NAMESPACE])[0]
+        cache.delete(follow_graph.CHANGE_KEY.format(version))
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+
+    def test_rolled_back_follow_is_forgotten(self):
+        follow_graph.get_graph()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.author)
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+            raise RuntimeError
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
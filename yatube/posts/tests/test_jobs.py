@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.jobs import enqueue, worker
+from core.models import Job
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(JOBS_EAGER=False)
+class JobsTest(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+
+    def test_job_is_enqueued_after_commit(self):
+        with transaction.atomic():
+            Post.objects.create(author=self.author, text='Пост')
+            self.assertFalse(Job.objects.exists())
+        self.assertTrue(
+            Job.objects.filter(task='posts.tasks.index_post').exists()
+        )
+
+    def test_rolled_back_work_is_not_enqueued(self):
+        try:
+            with transaction.atomic():
+                Post.objects.create(author=self.author, text='Пост')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Job.objects.exists())
+
+    def test_worker_runs_deferred_fan_out(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        call_command('run_jobs', stdout=StringIO())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertFalse(Job.objects.exists())
+
+    def test_job_is_claimed_once(self):
+        enqueue('posts.tasks.index_post', [0])
+        self.assertEqual(len(worker.claim(10)), 1)
+        self.assertEqual(worker.claim(10), [])
+
+    def test_failing_job_is_retried_then_failed(self):
+        enqueue('posts.tasks.missing', max_attempts=2)
+        self.assertEqual(worker.work(10), (0, 1))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('missing', job.error)
+        Job.objects.update(run_at=timezone.now())
+        self.assertEqual(worker.work(10), (0, 1))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(worker.work(10), (0, 0))
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from core import singleflight
+from posts import middleware
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Исходный текст'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+
+    def test_anonymous_page_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        self.assertNotContains(self.client.get(self.url), 'Тихая правка')
+        self.assertContains(
+            self.client.get(self.url, {'page': 2}), 'Тихая правка'
+        )
+
+    def test_authenticated_users_are_not_served_from_cache(self):
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        client = Client()
+        client.force_login(self.author)
+        self.assertContains(client.get(self.url), 'Тихая правка')
+
+    def test_signals_invalidate_pages(self):
+        group_url = reverse('posts:group_posts', args=[self.group.slug])
+        self.client.get(self.url)
+        self.client.get(group_url)
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Новый комментарий'
+        )
+        self.assertContains(self.client.get(self.url), 'Новый комментарий')
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.client.get(group_url), 'Новое название')
+
+    def test_errors_are_not_cached(self):
+        missing = reverse('posts:post_detail', args=[self.post.pk + 100])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        Post.objects.create(
+            id=self.post.pk + 100, author=self.author, text='Появился'
+        )
+        self.assertEqual(self.client.get(missing).status_code, 200)
+
+    @override_settings(PAGE_CACHE_WAIT=2)
+    def test_concurrent_miss_waits_for_the_render(self):
+        request = RequestFactory().get(self.url)
+        request.resolver_match = resolve(self.url)
+        key = middleware.page_key(
+            request, settings.PAGE_CACHE_VIEWS['posts:post_detail'],
+            request.resolver_match.func, request.resolver_match.kwargs,
+        )
+        # Другой запрос уже рендерит страницу и держит блокировку.
+        cache.add(singleflight.lock_key(key), 1, 2)
+        entry = (HttpResponse('Готовая страница'), time.time() + 60)
+        timer = threading.Timer(0.1, cache.set, [key, entry])
+        timer.start()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        timer.join()
+        self.assertEqual(response.content.decode(), 'Готовая страница')
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.templatetags.post_cards import card_key, post_cards
+
+User = get_user_model()
+
+
+class PostCardsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        self.group = Group.objects.create(title='Классика', slug='classic')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Текст поста'
+        )
+
+    def fresh_post(self):
+        return Post.objects.for_feed().get(pk=self.post.pk)
+
+    def test_every_feed_shows_the_same_card(self):
+        card = post_cards([self.fresh_post()])[0]
+        self.assertIn('Лев Толстой', card)
+        self.assertIn('Классика', card)
+        urls = [
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), card)
+
+    def test_cached_card_is_reused(self):
+        post = self.fresh_post()
+        cache.set(card_key(post), '<p>из кэша</p>')
+        self.assertEqual(post_cards([post]), ['<p>из кэша</p>'])
+        with self.assertNumQueries(0):
+            post_cards([post])
+
+    def test_edits_change_the_card(self):
+        post_cards([self.fresh_post()])
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertIn('Новый текст', post_cards([self.fresh_post()])[0])
+        updated = self.fresh_post().updated
+        self.group.title = 'Новая группа'
+        self.group.save()
+        self.assertIn('Новая группа', post_cards([self.fresh_post()])[0])
+        self.author.first_name = 'Алексей'
+        self.author.save()
+        self.assertIn('Алексей Толстой', post_cards([self.fresh_post()])[0])
+        # Переименования не выдают себя за правку поста.
+        self.assertEqual(self.fresh_post().updated, updated)
+
+    def test_login_does_not_change_the_card(self):
+        key = card_key(self.fresh_post())
+        self.client.force_login(self.author)
+        self.author.set_password('новый пароль')
+        self.author.save()
+        self.assertEqual(card_key(self.fresh_post()), key)
+
+    def test_rename_changes_cached_pages(self):
+        urls = [
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ]
+        for url in urls:
+            self.client.get(url)
+        self.author.first_name = 'Алексей'
+        self.author.save()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Алексей Толстой')
@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.feeds import follow_feed_token
+from posts.models import Comment, Follow, Group, Post, Suggestion
+from posts.urls import urlpatterns
+
+User = get_user_model()
+
+# Запросов на страницу, включая сессию и пользователя.
+QUERY_BUDGETS = {
+    'home_page': 4,
+    'group_posts': 5,
+    'profile': 7,
+    'post_detail': 4,
+    'post_search': 5,
+    'post_create': 3,
+    'post_edit': 5,
+    'add_comment': 3,
+    'post_comments': 3,
+    'follow_index': 7,
+    'profile_follow': 4,
+    'profile_unfollow': 4,
+    'api_index': 2,
+    'api_group_posts': 3,
+    'api_profile': 3,
+    'api_follow_index': 5,
+    'api_post_detail': 2,
+    'group_feed': 3,
+    'profile_feed': 3,
+    'follow_feed': 5,
+}
+
+
+class QueryBudgetMixin:
+    """Проверка, что число запросов view не зависит от объёма данных."""
+
+    def count_queries(self, client, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return len(queries)
+
+    def assertQueryBudget(self, client, url, budget, grow):
+        """Считает запросы до и после grow() и сверяет с бюджетом."""
+        before = self.count_queries(client, url)
+        grow()
+        after = self.count_queries(client, url)
+        self.assertEqual(
+            before, after, f'{url}: число запросов растёт с данными'
+        )
+        self.assertLessEqual(
+            after, budget, f'{url}: {after} запросов при бюджете {budget}'
+        )
+
+
+class PostsQueryBudgetTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Budget')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(title='Budget', slug='budget')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Budget'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Suggestion.objects.create(user=cls.reader, author=cls.author, score=1)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def grow(self):
+        first = User.objects.count()
+        for number in range(first, first + 5):
+            author = User.objects.create_user(username=f'Extra{number}')
+            Follow.objects.create(user=self.reader, author=author)
+            post = Post.objects.create(
+                author=author, group=self.group, text='Extra'
+            )
+            Post.objects.create(
+                author=self.author, group=self.group, text='More'
+            )
+            Comment.objects.create(
+                post=self.post, author=author, text='Extra'
+            )
+            Comment.objects.create(post=post, author=author, text='Extra')
+
+    def test_every_view_has_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    def test_views_fit_budget(self):
+        post_kwargs = {'post_id': self.post.pk}
+        urls = {
+            'home_page': (self.reader_client, reverse('posts:home_page')),
+            'group_posts': (self.reader_client, reverse(
+                'posts:group_posts', kwargs={'slug': self.group.slug}
+            )),
+            'profile': (self.reader_client, reverse(
+                'posts:profile', kwargs={'username': self.author}
+            )),
+            'post_detail': (self.reader_client, reverse(
+                'posts:post_detail', kwargs=post_kwargs
+            )),
+            'post_search': (
+                self.reader_client, reverse('posts:post_search') + '?q=Extra'
+            ),
+            'post_create': (self.author_client, reverse('posts:post_create')),
+            'post_edit': (self.author_client, reverse(
+                'posts:post_edit', kwargs=post_kwargs
+            )),
+            'add_comment': (self.reader_client, reverse(
+                'posts:add_comment', kwargs=post_kwargs
+            )),
+            'post_comments': (self.reader_client, reverse(
+                'posts:post_comments', kwargs=post_kwargs
+            ) + '?cursor=1_1'),
+            'follow_index': (self.reader_client, reverse(
+                'posts:follow_index'
+            )),
+            'profile_follow': (self.reader_client, reverse(
+                'posts:profile_follow', kwargs={'username': self.author}
+            )),
+            'profile_unfollow': (self.author_client, reverse(
+                'posts:profile_unfollow', kwargs={'username': self.reader}
+            )),
+            'api_index': (self.reader_client, reverse('posts:api_index')),
+            'api_group_posts': (self.reader_client, reverse(
+                'posts:api_group_posts', kwargs={'slug': self.group.slug}
+            )),
+            'api_profile': (self.reader_client, reverse(
+                'posts:api_profile', kwargs={'username': self.author}
+            )),
+            'api_follow_index': (self.reader_client, reverse(
+                'posts:api_follow_index'
+            )),
+            'api_post_detail': (self.reader_client, reverse(
+                'posts:api_post_detail', kwargs=post_kwargs
+            )),
+            'group_feed': (Client(), reverse(
+                'posts:group_feed', kwargs={'slug': self.group.slug}
+            )),
+            'profile_feed': (Client(), reverse(
+                'posts:profile_feed', kwargs={'username': self.author}
+            )),
+            'follow_feed': (Client(), reverse(
+                'posts:follow_feed',
+                kwargs={'token': follow_feed_token(self.reader)}
+            )),
+        }
+        self.assertEqual(set(urls), set(QUERY_BUDGETS))
+        for name, (client, url) in urls.items():
+            with self.subTest(name=name):
+                self.assertQueryBudget(
+                    client, url, QUERY_BUDGETS[name], self.grow
+                )
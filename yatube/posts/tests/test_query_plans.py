@@ -0,0 +1,88 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.feeds import follow_feed_token
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Полный проход по таблице без индекса и сортировка во временном дереве.
+# Проход по подзапросу COUNT(*) — чтение его же результата, не таблицы.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?!subquery$)\w+( AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTest(TestCase):
+    """Запросы лент идут по индексам, без полных проходов и сортировок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Plan')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(title='Plan', slug='plan')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(3):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'План {number}'
+            )
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text='План'
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plan(self, sql):
+        # Параметры уже подставлены, поэтому запрос уходит мимо
+        # форматирования Django.
+        rows = connection.connection.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in rows]
+
+    def problems(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        found = []
+        for query in queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            for step in self.plan(query['sql']):
+                if FULL_SCAN.match(step) or TEMP_SORT in step:
+                    found.append(f'{step}: {query["sql"]}')
+        return found
+
+    def test_feeds_use_indexes(self):
+        urls = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:post_comments', args=[self.post.pk])
+            + '?cursor=1_1',
+            reverse('posts:follow_index'),
+            reverse('posts:follow_index') + '?cursor=1_1',
+            reverse('posts:home_page') + '?cursor=1_1',
+            reverse('posts:profile', args=[self.author.username])
+            + '?cursor=1_1',
+            reverse('posts:api_index'),
+            reverse('posts:api_group_posts', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index') + '?cursor=1_1',
+            reverse('posts:api_post_detail', args=[self.post.pk]),
+            reverse('posts:group_feed', args=[self.group.slug]),
+            reverse('posts:profile_feed', args=[self.author.username]),
+            reverse(
+                'posts:follow_feed', args=[follow_feed_token(self.reader)]
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.problems(url), [])
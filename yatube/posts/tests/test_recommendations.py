@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import recommendations
+from posts.models import Comment, Follow, Post, Suggestion
+
+User = get_user_model()
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.friend, cls.author, cls.commenter, cls.silent = (
+            User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'author', 'commenter', 'silent')
+        )
+        for user in (cls.friend, cls.author, cls.commenter):
+            Post.objects.create(author=user, text=f'Пост {user}')
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        Follow.objects.create(user=cls.friend, author=cls.silent)
+        post = cls.friend.posts.get()
+        for user in (cls.reader, cls.commenter):
+            Comment.objects.create(post=post, author=user, text='Согласен')
+
+    def setUp(self):
+        cache.clear()
+
+    def suggested(self, user):
+        return list(
+            Suggestion.objects.filter(user=user).order_by('-score', 'author')
+            .values_list('author__username', flat=True)
+        )
+
+    def test_friends_of_friends_and_co_commenters(self):
+        recommendations.compute()
+        # silent без постов, friend уже в подписках.
+        self.assertEqual(self.suggested(self.reader), ['author', 'commenter'])
+        self.assertEqual(self.suggested(self.commenter), [])
+
+    def test_recompute_replaces_old_suggestions(self):
+        Suggestion.objects.create(
+            user=self.commenter, author=self.silent, score=10
+        )
+        recommendations.compute(limit=1)
+        self.assertEqual(self.suggested(self.reader), ['author'])
+        self.assertEqual(self.suggested(self.commenter), [])
+
+    def test_crowded_posts_are_skipped(self):
+        recommendations.compute(max_commenters=1)
+        self.assertEqual(self.suggested(self.reader), ['author'])
+
+    def test_follow_page_hides_followed_authors(self):
+        call_command('recommend_follows', stdout=StringIO())
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        response = client.get(url)
+        self.assertEqual(
+            [author.username for author in response.context['suggestions']],
+            ['author', 'commenter'],
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = client.get(url)
+        self.assertEqual(
+            [author.username for author in response.context['suggestions']],
+            ['commenter'],
+        )
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import replicas
+from core.middleware import ReplicaPinMiddleware
+from posts.models import Post
+
+User = get_user_model()
+
+router = replicas.ReplicaRouter()
+
+
+def chosen_database(request):
+    return HttpResponse(router.db_for_read(Post) or 'default')
+
+
+@override_settings(READ_REPLICA='replica')
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.view = replicas.read_from_replica(chosen_database)
+
+    def request(self, method='get'):
+        request = getattr(RequestFactory(), method)('/')
+        request.session = SessionStore()
+        return request
+
+    def test_feed_reads_go_to_replica(self):
+        self.assertEqual(self.view(self.request()).content, b'replica')
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_write_pins_session_to_primary(self):
+        request = self.request('post')
+        ReplicaPinMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(self.view(request).content, b'default')
+        request.session[replicas.PIN_KEY] = 0
+        self.assertEqual(self.view(request).content, b'replica')
+
+    def test_read_does_not_pin(self):
+        request = self.request()
+        ReplicaPinMiddleware(lambda request: HttpResponse())(request)
+        self.assertNotIn(replicas.PIN_KEY, request.session)
+
+    def test_follow_links_pin_session(self):
+        reader = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='author')
+        for name in ('posts:profile_follow', 'posts:profile_unfollow'):
+            with self.subTest(name=name):
+                client = Client()
+                client.force_login(reader)
+                client.get(reverse(name, args=[author.username]))
+                self.assertIn(replicas.PIN_KEY, client.session)
+
+    def test_replica_pages_get_generation(self):
+        cache.clear()
+        self.assertEqual(replicas.generation(chosen_database), '')
+        self.assertEqual(replicas.generation(self.view), '0')
+        replicas.new_generation()
+        self.assertNotEqual(replicas.generation(self.view), '0')
+
+    @override_settings(READ_REPLICA=None)
+    def test_without_replica_everything_reads_default(self):
+        self.assertEqual(self.view(self.request()).content, b'default')
+
+
+class SyncReplicaTest(TestCase):
+    def test_copy_has_schema(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            cache.delete(replicas.GENERATION_KEY)
+            call_command('sync_replica', '--to', path, stdout=StringIO())
+            replica = sqlite3.connect(path)
+            tables = {
+                name for name, in replica.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+            replica.close()
+        self.assertIn(Post._meta.db_table, tables)
+        # Страницы со старой копии реплики больше не читаются.
+        self.assertIsNotNone(cache.get(replicas.GENERATION_KEY))
@@ -0,0 +1,122 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from posts import search
+from posts.models import Comment, Post
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTest(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова приводятся к одной основе."""
+        forms = (
+            ('котики', 'котиков', 'котик'),
+            ('возможность', 'возможности'),
+            ('программирование', 'программированию'),
+            ('ёлка', 'Ёлки'),
+        )
+        for words in forms:
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Seeker')
+
+    def setUp(self):
+        self.cats = Post.objects.create(
+            author=self.user, text='Котики и котики: всё про котиков'
+        )
+        self.dogs = Post.objects.create(
+            author=self.user, text='Собаки бывают разные, котик тоже'
+        )
+
+    def test_ranked_by_relevance(self):
+        self.assertEqual(
+            search.search('котиками'), [self.cats.pk, self.dogs.pk]
+        )
+
+    def test_comments_are_indexed(self):
+        comment = Comment.objects.create(
+            post=self.dogs, author=self.user, text='Отличные попугаи'
+        )
+        self.assertEqual(search.search('попугай'), [self.dogs.pk])
+        comment.delete()
+        self.assertEqual(search.search('попугай'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.cats.text = 'Теперь про хомяков'
+        self.cats.save()
+        self.assertEqual(search.search('хомяк'), [self.cats.pk])
+        self.assertEqual(search.search('котики'), [self.dogs.pk])
+        self.cats.delete()
+        self.assertEqual(search.search('хомяк'), [])
+
+    def test_inverted_index_backend(self):
+        """Запасной индекс на Python ищет так же."""
+        backend = search.InvertedIndexBackend()
+        for post in Post.objects.all():
+            backend.index_post(post)
+        terms = search.tokenize('котиков')
+        self.assertEqual(backend.search(terms), [self.cats.pk, self.dogs.pk])
+        self.assertEqual(backend.search(search.tokenize('собаки')), [
+            self.dogs.pk
+        ])
+        self.assertEqual(backend.search(search.tokenize('котик жираф')), [])
+
+    def test_terms_split_between_post_and_comments(self):
+        """Оба индекса находят пост по словам из текста и комментария."""
+        Comment.objects.create(
+            post=self.dogs, author=self.user, text='Отличные попугаи'
+        )
+        inverted = search.InvertedIndexBackend()
+        inverted.rebuild()
+        terms = search.tokenize('собаки попугаи')
+        self.assertEqual(search.search('собаки попугаи'), [self.dogs.pk])
+        self.assertEqual(inverted.search(terms), [self.dogs.pk])
+
+    def test_limit(self):
+        self.assertEqual(len(search.search('котик', limit=1)), 1)
+        self.assertEqual(len(search.search('котик', limit=None)), 2)
+
+    def test_comment_rewrites_only_its_row(self):
+        comments = [
+            Comment.objects.create(
+                post=self.cats, author=self.user, text=f'Мяу {number}'
+            )
+            for number in range(5)
+        ]
+        backend = search.get_backend()
+        self.assertIsInstance(backend, search.Fts5Backend)
+        # Удалить прежнюю строку комментария и вставить новую.
+        with self.assertNumQueries(2):
+            backend.index_comment(comments[0])
+        with self.assertNumQueries(1):
+            backend.remove_comment(comments[1])
+
+    def test_migration_rebuilds_index(self):
+        Comment.objects.create(
+            post=self.dogs, author=self.user, text='Отличные попугаи'
+        )
+        migration = import_module('posts.migrations.0025_search_documents')
+        editor = type('SchemaEditor', (), {'connection': connection})
+        migration.rebuild_fts_table(apps, editor)
+        self.assertEqual(search.search('собаки попугаи'), [self.dogs.pk])
+        self.assertEqual(
+            search.search('котиками'), [self.cats.pk, self.dogs.pk]
+        )
+
+    def test_search_page(self):
+        response = self.client.get(
+            reverse('posts:post_search'), {'q': 'собака'}
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.dogs])
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+import unittest
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.cache import SharedCache, default_location
+
+
+class SharedCacheTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SharedCache(self.location, {'OPTIONS': options})
+
+    def test_basic_operations(self):
+        cache = self.cache
+        cache.set('page', {'html': 'Лента'})
+        self.assertEqual(cache.get('page'), {'html': 'Лента'})
+        self.assertIsNone(cache.get('missing'))
+        self.assertFalse(cache.add('page', 'другое'))
+        self.assertTrue(cache.add('fresh', 1))
+        self.assertEqual(cache.incr('fresh', 5), 6)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2})
+        cache.delete('a')
+        self.assertFalse(cache.has_key('a'))
+        cache.clear()
+        self.assertIsNone(cache.get('page'))
+
+    def test_expiry(self):
+        self.cache.set('short', 1, timeout=0.05)
+        self.cache.set('forever', 2, timeout=None)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.get('forever'), 2)
+
+    def test_default_location_is_private(self):
+        directory = os.path.dirname(default_location())
+        info = os.stat(directory)
+        self.assertEqual(info.st_uid, os.getuid())
+        self.assertFalse(info.st_mode & 0o077)
+
+    def test_refuses_writable_directory(self):
+        os.chmod(os.path.dirname(self.location), 0o777)
+        with self.assertRaises(ImproperlyConfigured):
+            self.cache.get('page')
+
+    @unittest.skipUnless(os.geteuid() == 0, 'нужен chown')
+    def test_refuses_foreign_file(self):
+        """Файл, подложенный другим пользователем, не читается."""
+        open(self.location, 'wb').close()
+        os.chown(self.location, 12345, -1)
+        with self.assertRaises(ImproperlyConfigured):
+            self.cache.get('page')
+
+    def test_shared_between_instances(self):
+        """Второй экземпляр, как другой воркер, видит те же записи."""
+        self.cache.set('page', 'Лента')
+        self.assertEqual(self.make_cache().get('page'), 'Лента')
+
+    def test_lru_eviction_by_size(self):
+        cache = self.make_cache(MAX_SIZE=10000, CULL_FREQUENCY=4)
+        cache.set('recent', 'x' * 1000)
+        for number in range(20):
+            cache.set(f'old{number}', 'x' * 1000)
+            # Читаемый ключ не должен вытесняться.
+            cache._db.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                [time.time() + 60, cache.make_key('recent')]
+            )
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 10000)
+        self.assertEqual(cache.get('recent'), 'x' * 1000)
+        self.assertIsNone(cache.get('old0'))
+
+    def test_stats(self):
+        self.cache.set('page', 'Лента')
+        self.cache.get('page')
+        self.cache.get('page')
+        self.cache.get('missing')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertEqual(stats['hit_ratio'], 0.667)
+        self.assertEqual(stats['entries'], 1)
+        self.assertGreater(stats['bytes'], 0)
+
+    def test_cache_stats_command(self):
+        settings = {'default': {
+            'BACKEND': 'core.cache.SharedCache', 'LOCATION': self.location,
+        }}
+        with override_settings(CACHES=settings):
+            out = StringIO()
+            call_command('cache_stats', stdout=out)
+        self.assertIn('hit_ratio', out.getvalue())
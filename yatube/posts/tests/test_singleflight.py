@@ -0,0 +1,122 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import singleflight
+from core.replicas import read_from_replica
+from posts.models import Post
+from posts.pagination import page_flight_key
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_threads(self, target, count=4):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_calls_share_one_run(self):
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return HttpResponse('Лента')
+
+        self.run_threads(
+            lambda: results.append(singleflight.do('feed', slow))
+        )
+        self.assertEqual(len(calls), 1)
+        contents = {result.content.decode() for result in results}
+        self.assertEqual(contents, {'Лента'})
+        # Каждый поток получил свой ответ.
+        self.assertEqual(len({id(result) for result in results}), 4)
+
+    def test_errors_reach_every_caller(self):
+        errors = []
+
+        def broken():
+            time.sleep(0.2)
+            raise ValueError('ошибка')
+
+        def call():
+            try:
+                singleflight.do('broken', broken)
+            except ValueError as error:
+                errors.append(error)
+
+        self.run_threads(call)
+        self.assertEqual(len(errors), 4)
+
+    def test_stale_value_is_served_while_refreshing(self):
+        cache.set('feed', ('старое', time.time() - 1), 60)
+        cache.add(singleflight.lock_key('feed'), 1, 5)
+        self.assertEqual(
+            singleflight.cached('feed', lambda: 'новое', 10, stale=60),
+            'старое',
+        )
+        cache.delete(singleflight.lock_key('feed'))
+        self.assertEqual(
+            singleflight.cached('feed', lambda: 'новое', 10, stale=60),
+            'новое',
+        )
+        self.assertIsNone(cache.get(singleflight.lock_key('feed')))
+        self.assertEqual(cache.get('feed')[0], 'новое')
+
+    def test_store_if_skips_storing(self):
+        singleflight.cached('feed', lambda: 'ошибка', 10, store_if=bool)
+        self.assertEqual(cache.get('feed')[0], 'ошибка')
+        singleflight.cached('empty', lambda: '', 10, store_if=bool)
+        self.assertIsNone(cache.get('empty'))
+
+    def test_decorator_without_timeout_does_not_cache(self):
+        calls = []
+
+        @singleflight.single_flight(lambda value: f'double:{value}')
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(calls, [2, 2])
+        self.assertIsNone(cache.get('double:2'))
+
+
+class PageFlightKeyTest(TestCase):
+    def test_key_depends_on_query_and_page(self):
+        def request(page):
+            return type('Request', (), {'GET': {'page': page}})()
+
+        posts = Post.objects.all()
+        self.assertEqual(
+            page_flight_key(posts, request('1')),
+            page_flight_key(Post.objects.all(), request('1')),
+        )
+        self.assertNotEqual(
+            page_flight_key(posts, request('1')),
+            page_flight_key(posts, request('2')),
+        )
+        self.assertNotEqual(
+            page_flight_key(posts, request('1')),
+            page_flight_key(posts.filter(group_id=1), request('1')),
+        )
+        self.assertIsNone(
+            page_flight_key(Post.objects.none(), request('1'))
+        )
+
+    @override_settings(READ_REPLICA='replica')
+    def test_key_depends_on_database(self):
+        def key(request):
+            return page_flight_key(Post.objects.all(), request)
+
+        request = type('Request', (), {'GET': {'page': '1'}})()
+        self.assertNotEqual(key(request), read_from_replica(key)(request))
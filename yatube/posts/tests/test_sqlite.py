@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class SqliteSettingsTest(TestCase):
+    def pragma(self, name):
+        return connection.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        connection.ensure_connection()
+        pragmas = settings.SQLITE_PRAGMAS
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), pragmas['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+
+    def test_benchmark_compares_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sqlite.json')
+            call_command(
+                'benchmark_sqlite', '--seconds', '0.2', '--rows', '100',
+                '--readers', '2', '--writers', '1', '--output', path,
+                stdout=StringIO(),
+            )
+            with open(path, encoding='utf-8') as file:
+                results = json.load(file)['results']
+        self.assertEqual(set(results), {'default', 'tuned'})
+        self.assertGreater(results['tuned']['reads_per_second'], 0)
+        self.assertGreater(results['tuned']['writes_per_second'], 0)
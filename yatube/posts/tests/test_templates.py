@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.template import Context, Engine
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.template_loaders import warm_up
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+TEMPLATES = {
+    'page.html': (
+        "<main>{% include 'card.html' %}</main>"
+        "{% include name %}"
+        "{% include 'card.html' with title='Другой' %}"
+        "{% include 'block.html' %}"
+    ),
+    'card.html': "<b>{{ title }}</b>{% include 'image.html' %}",
+    'image.html': '<img>',
+    'block.html': '{% block body %}тело{% endblock %}',
+    'loop.html': "{% include 'loop.html' %}",
+}
+
+
+class InliningLoaderTest(SimpleTestCase):
+    def engine(self, inlining):
+        loader = ('django.template.loaders.locmem.Loader', TEMPLATES)
+        if inlining:
+            loader = ('core.template_loaders.InliningLoader', [loader])
+        return Engine(loaders=[loader])
+
+    def test_static_includes_are_inlined(self):
+        source = self.engine(True).get_template('page.html').source
+        self.assertIn('<main><b>{{ title }}</b><img></main>', source)
+        self.assertIn('{% include name %}', source)
+        self.assertIn("{% include 'card.html' with title=", source)
+        self.assertIn("{% include 'block.html' %}", source)
+
+    def test_render_is_unchanged(self):
+        context = {'title': 'Пост', 'name': 'image.html'}
+        self.assertEqual(
+            self.engine(True).get_template('page.html').render(
+                Context(context)
+            ),
+            self.engine(False).get_template('page.html').render(
+                Context(context)
+            ),
+        )
+
+    def test_recursive_include_is_left_alone(self):
+        source = self.engine(True).get_template('loop.html').source
+        self.assertEqual(source.count('include'), 1)
+
+    def test_warm_up_only_in_production(self):
+        with override_settings(TEMPLATE_MODE='debug'):
+            self.assertEqual(warm_up(), 0)
+        with override_settings(TEMPLATE_MODE='production'):
+            self.assertGreater(warm_up(), 0)
+
+
+class BenchmarkTemplatesTest(TestCase):
+    def test_report_has_every_template(self):
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        group = Group.objects.create(title='Группа', slug='group')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.create(author=author, group=group, text='Пост')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'templates.json')
+            call_command(
+                'benchmark_templates', '--runs', '2', '--warmup', '0',
+                '--output', path, stdout=StringIO(),
+            )
+            with open(path, encoding='utf-8') as file:
+                report = json.load(file)
+        self.assertIn('posts/index.html', report['results'])
+        self.assertEqual(report['results']['posts/index.html']['queries'], 0)
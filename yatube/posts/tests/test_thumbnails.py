@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts import thumbnails
+from posts.constants import THUMBNAIL_SRCSET_GEOMETRIES
+from posts.forms import PostForm
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=False)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Painter')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def make_post(self):
+        form = PostForm(
+            data={'text': 'Picture'},
+            files={'image': SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            )},
+        )
+        self.assertTrue(form.is_valid())
+        post = form.save(commit=False)
+        post.author = self.user
+        post.save()
+        return post
+
+    def test_generate_stores_renditions(self):
+        """Превью считаются заранее и сохраняются в посте."""
+        post = self.make_post()
+        self.assertTrue(post.thumbnails_pending)
+        self.assertEqual(thumbnails.pending(10), [post.pk])
+        thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnails_pending)
+        self.assertTrue(post.thumbnail_url)
+        self.assertEqual(
+            len(post.thumbnail_srcset.split(', ')),
+            len(THUMBNAIL_SRCSET_GEOMETRIES)
+        )
+        self.assertIn(post.thumbnail_url, post.thumbnail_srcset)
+
+    def test_feed_uses_stored_thumbnail(self):
+        """Лента выводит сохранённый адрес превью."""
+        post = self.make_post()
+        Post.objects.filter(pk=post.pk).update(
+            thumbnail_url='/media/cache/ready.jpg'
+        )
+        response = Client().get(reverse('posts:home_page'))
+        self.assertContains(response, '/media/cache/ready.jpg')
@@ -0,0 +1,90 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from posts import timelines
+from posts.models import AuthorStats, Follow, Post, TimelineEntry
+from yatube.settings import TIMELINE_FANOUT_LIMIT
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Writer')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_post_goes_to_followers(self):
+        """Новый пост попадает в ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Fresh')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(timelines.timeline(self.reader)), [post])
+
+    def test_follow_and_unfollow_update_timeline(self):
+        """Подписка подтягивает старые посты, отписка их убирает."""
+        post = Post.objects.create(author=self.author, text='Old')
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(list(timelines.timeline(self.reader)), [post])
+        follow.delete()
+        self.assertFalse(timelines.timeline(self.reader).exists())
+
+    def set_followers(self, count):
+        AuthorStats.objects.filter(user=self.author).update(
+            followers_count=count
+        )
+        return timelines.refresh_celebrities([self.author.pk])
+
+    def test_celebrity_posts_are_merged_on_read(self):
+        """Посты авторов-знаменитостей подмешиваются при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.set_followers(TIMELINE_FANOUT_LIMIT + 1), [])
+        self.assertEqual(timelines.celebrities(), {self.author.pk})
+        post = Post.objects.create(author=self.author, text='Star')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(list(timelines.timeline(self.reader)), [post])
+
+    def test_former_celebrity_posts_are_backfilled(self):
+        """Посты бывшей знаменитости дополняются в ленты подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.set_followers(TIMELINE_FANOUT_LIMIT + 1)
+        post = Post.objects.create(author=self.author, text='Star')
+        # Подписка и отписка другого читателя опускают число
+        # подписчиков до предела.
+        AuthorStats.objects.filter(user=self.author).update(
+            followers_count=TIMELINE_FANOUT_LIMIT
+        )
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=other, author=self.author).delete()
+        self.assertEqual(timelines.celebrities(), set())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+
+    def test_backfill_command_rebuilds_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Lost')
+        TimelineEntry.objects.all().delete()
+        call_command(
+            'backfill_timelines', self.reader.username, stdout=StringIO()
+        )
+        self.assertEqual(list(timelines.timeline(self.reader)), [post])
+
+    def test_migration_fills_existing_timelines(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Before')
+        TimelineEntry.objects.all().delete()
+        migration = import_module('posts.migrations.0017_timelineentry')
+        migration.fill_timelines(apps, None)
+        self.assertEqual(list(timelines.timeline(self.reader)), [post])
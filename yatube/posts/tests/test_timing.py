@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.base import BaseCache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import timing
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(REQUEST_TIMING=True)
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        timing.aggregate.reset()
+
+    def test_header_and_aggregate(self):
+        """Запрос получает Server-Timing и попадает в статистику."""
+        response = self.client.get(reverse('posts:profile', args=['auth']))
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'cache;desc=', 'total;dur='):
+            self.assertIn(metric, header)
+        stats = timing.aggregate.snapshot()['posts:profile']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['template_ms'], 0)
+        self.assertTrue(stats['slowest_queries'])
+
+    def test_cache_lookups_counted(self):
+        self.client.get(reverse('posts:home_page'))
+        self.client.get(reverse('posts:home_page'))
+        stats = timing.aggregate.snapshot()['posts:home_page']
+        self.assertEqual(stats['requests'], 2)
+        self.assertIsNotNone(stats['cache_hit_ratio'])
+
+    def test_stats_for_staff_only(self):
+        url = reverse('request_timings')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        self.client.get(reverse('posts:home_page'))
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts:home_page', response.json())
+
+
+class ServerTimingDisabledTest(TestCase):
+    def test_no_header_by_default(self):
+        response = self.client.get(reverse('posts:home_page'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class CacheCountersTest(SimpleTestCase):
+    def test_get_many_counts_each_key_once(self):
+        class Cache(BaseCache):
+            """get_many унаследован от BaseCache и вызывает get."""
+            data = {'a': 1}
+
+            def get(self, key, default=None, version=None):
+                return self.data.get(key, default)
+
+        timing._wrap_cache(Cache)
+        backend = Cache({})
+        timings = timing.start(slowest_limit=5)
+        self.addCleanup(timing.stop)
+        self.assertEqual(backend.get_many(['a', 'b']), {'a': 1})
+        self.assertEqual((timings.cache_hits, timings.cache_misses), (1, 1))
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual((timings.cache_hits, timings.cache_misses), (1, 2))
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import caching, counts, follow_graph, tasks, transfer
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class TransferTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        group = Group.objects.create(title='Группа', slug='group')
+        for number in range(3):
+            post = Post.objects.create(
+                author=self.author, group=group,
+                text=f'Пост, "{number}"\nвторая строка'
+            )
+            Comment.objects.create(
+                post=post, author=self.reader, text='Комментарий'
+            )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.posts = list(Post.objects.values_list('pk', 'text', 'pub_date'))
+
+    def call(self, name, *args):
+        call_command(name, self.directory, *args, stdout=StringIO())
+
+    def wipe(self):
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def test_round_trip(self):
+        for data_format in transfer.FORMATS:
+            with self.subTest(data_format=data_format):
+                self.call('export_data', '--format', data_format)
+                self.wipe()
+                graph_version = caching.versions([follow_graph.NAMESPACE])
+                self.call('import_data', '--format', data_format)
+                self.assertNotEqual(
+                    caching.versions([follow_graph.NAMESPACE]), graph_version
+                )
+                self.assertEqual(
+                    list(Post.objects.values_list('pk', 'text', 'pub_date')),
+                    self.posts
+                )
+                self.assertEqual(Comment.objects.count(), 3)
+                self.assertTrue(Follow.objects.filter(
+                    user__username='reader', author__username='author'
+                ).exists())
+                author = User.objects.get(username='author')
+                self.assertEqual(
+                    AuthorStats.objects.get(user=author).posts_count, 3
+                )
+                self.assertFalse(os.path.exists(
+                    os.path.join(self.directory, transfer.CHECKPOINT)
+                ))
+
+    def test_import_refreshes_pages_counts_and_thumbnails(self):
+        post = Post.objects.create(
+            author=self.author, text='С картинкой', image='posts/cat.jpg'
+        )
+        self.call('export_data')
+        self.wipe()
+        namespaces = ['posts', 'group:group', 'profile:author']
+        versions = caching.versions(namespaces)
+        # Числа постов, посчитанные до загрузки.
+        for name in ('posts', 'group:group'):
+            cache.set(counts.COUNT_KEY.format(name), (0, time.time()), None)
+        with mock.patch.object(tasks.generate_thumbnails, 'defer') as defer:
+            self.call('import_data')
+        defer.assert_called_once_with(post.pk)
+        for new, old in zip(caching.versions(namespaces), versions):
+            self.assertNotEqual(new, old)
+        self.assertEqual(counts.post_count('posts'), 4)
+        self.assertEqual(counts.post_count('group:group'), 3)
+        self.assertTrue(Post.objects.get(pk=post.pk).thumbnails_pending)
+
+    def test_import_resumes_from_checkpoint(self):
+        self.call('export_data')
+        path = transfer.data_path(self.directory, 'posts', 'ndjson')
+        (first, offset), *_ = transfer.read(path, 'ndjson', 0)
+        transfer.Checkpoint(self.directory).save('posts', offset=offset)
+        self.wipe()
+        self.call('import_data', '--resume', '--skip-derived')
+        self.assertFalse(Post.objects.filter(pk=first['id']).exists())
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_export_resumes_from_checkpoint(self):
+        checkpoint = transfer.Checkpoint(self.directory)
+        transfer.export('posts', self.directory, 'csv', checkpoint)
+        Post.objects.create(author=self.author, text='Новый')
+        self.assertEqual(
+            transfer.export('posts', self.directory, 'csv', checkpoint), 1
+        )
+        path = transfer.data_path(self.directory, 'posts', 'csv')
+        rows = [row for row, _ in transfer.read(path, 'csv', 0)]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]['text'], 'Новый')
@@ -6,10 +6,13 @@ from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from posts.models import Follow, Group, Post
+from posts.pagination import CursorPaginator, encode_cursor
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -217,6 +220,43 @@ class PaginatorViewsTest(TestCase):
                 )
                 self.assertEqual(len(response.context['page_obj']), 3)
 
+    def test_cursor_pagination(self):
+        """Курсор продолжает ленту с места, где закончилась страница."""
+        first_page = Post.objects.order_by('-pub_date', '-pk')[:10]
+        last = first_page[9]
+        cursor = encode_cursor(last.pub_date, last.pk)
+        response = self.authorized_client.get(
+            reverse('posts:home_page'), {'cursor': cursor}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 3)
+        self.assertIsNone(page_obj.next_cursor)
+        self.assertNotIn(last, page_obj.object_list)
+
+    def test_cursor_paginator_rejects_other_orderings(self):
+        orderings = (
+            ('-pub_date',),
+            ('-pub_date', 'id'),
+            ('-pub_date', '-id', 'text'),
+            ('group__title', 'id'),
+            ('?', 'id'),
+            (F('pub_date').desc(), '-id'),
+        )
+        for ordering in orderings:
+            with self.subTest(ordering=ordering):
+                posts = Post.objects.order_by(*ordering)
+                paginator = CursorPaginator(posts, 10)
+                with self.assertRaises(ImproperlyConfigured):
+                    paginator.page_after(None)
+
+    def test_broken_cursor_opens_first_page(self):
+        response = self.authorized_client.get(
+            reverse('posts:home_page'), {'cursor': 'broken'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertIsNotNone(page_obj.next_cursor)
+
 
 class PostCreateTest(TestCase):
     @classmethod
@@ -283,7 +323,11 @@ class TestCache(TestCase):
         cls.authorized_client = Client()
         cls.authorized_client.force_login(cls.user)
 
-    def test_home_page_20_sec_cache(self):
+    def setUp(self):
+        cache.clear()
+
+    def test_home_page_cached_until_write(self):
+        """Без записей через ORM главная страница отдаётся из кэша."""
         self.post = Post.objects.create(
             author=self.user,
             text="HelloCache"
@@ -291,7 +335,7 @@ class TestCache(TestCase):
         first_response = self.authorized_client.get(
             reverse('posts:home_page')
         )
-        Post.objects.all().delete()
+        Post.objects.filter(pk=self.post.pk).update(text='Changed')
         second_response = self.authorized_client.get(
             reverse('posts:home_page')
         )
@@ -304,6 +348,44 @@ class TestCache(TestCase):
         )
         self.assertNotEqual(second_response.content, cleared_response.content)
 
+    def test_cache_invalidated_by_signals(self):
+        """Удаление поста сразу сбрасывает кэш ленты, группы и профиля."""
+        group = Group.objects.create(title='CacheGroup', slug='cache-group')
+        post = Post.objects.create(
+            author=self.user,
+            group=group,
+            text='SoonDeleted'
+        )
+        urls = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            self.authorized_client.get(url)
+        post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertNotContains(response, 'SoonDeleted')
+
+    def test_browser_does_not_cache_feeds(self):
+        group = Group.objects.create(title='CacheGroup', slug='cache-group')
+        urls = (
+            reverse('posts:home_page'),
+            reverse('posts:group_posts', kwargs={'slug': group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for client in (Client(), self.authorized_client):
+            for url in urls:
+                # Второй ответ берётся из кэша сервера.
+                for _ in range(2):
+                    response = client.get(url)
+                    with self.subTest(url=url):
+                        self.assertFalse(response.has_header('Expires'))
+                        self.assertIn('max-age=0', response['Cache-Control'])
+                        self.assertIn('private', response['Cache-Control'])
+
 
 class TestFollow(TestCase):
     @classmethod
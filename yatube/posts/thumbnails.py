@@ -0,0 +1,49 @@
+"""Превью картинок постов, подготовленные заранее.
+
+PostForm помечает пост с новой картинкой флагом thumbnails_pending,
+сигнал ставит задачу generate_thumbnails в очередь core.jobs, воркер
+считает превью и записывает их адреса в сам пост. Команда
+render_thumbnails досчитывает посты, оставшиеся с флагом. Шаблоны
+лент выводят готовые адреса и не обращаются ни к Pillow, ни к
+хранилищу sorl-thumbnail.
+"""
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from . import caching
+from .constants import THUMBNAIL_GEOMETRY, THUMBNAIL_SRCSET_GEOMETRIES
+from .models import Post
+
+
+def generate(post_id):
+    """Считает превью поста и сохраняет их адреса."""
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        return
+    thumbnail_url = ''
+    srcset = []
+    if post.image:
+        for geometry in THUMBNAIL_SRCSET_GEOMETRIES:
+            image = get_thumbnail(
+                post.image, geometry, crop='center', upscale=True
+            )
+            srcset.append(f'{image.url} {image.width}w')
+            if geometry == THUMBNAIL_GEOMETRY:
+                thumbnail_url = image.url
+    # Пока считались превью, картинку могли заменить ещё раз.
+    Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail_url=thumbnail_url,
+        thumbnail_srcset=', '.join(srcset),
+        thumbnails_pending=False,
+        updated=timezone.now(),
+    )
+    caching.bump(*caching.post_namespaces(post))
+
+
+def pending(limit):
+    """id постов, ждущих превью, начиная с самых новых."""
+    return list(Post.objects.filter(
+        thumbnails_pending=True
+    ).values_list('pk', flat=True)[:limit])
@@ -0,0 +1,136 @@
+"""Материализованные ленты подписок (fan-out on write).
+
+При публикации пост раскладывается в ленты подписчиков автора, и
+/follow/ читает готовый диапазон по индексу (user, -pub_date). Авторы
+с огромным числом подписчиков в ленты не раскладываются: их посты
+подмешиваются при чтении. Отметка знаменитости хранится в AuthorStats
+и меняется, когда число подписчиков переходит TIMELINE_FANOUT_LIMIT;
+автору, переставшему быть знаменитостью, ленты подписчиков
+дополняются его постами.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+
+from yatube.settings import TIMELINE_BACKFILL_LIMIT, TIMELINE_FANOUT_LIMIT
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+CELEBRITIES_KEY = 'timeline:celebrities'
+CELEBRITIES_TIMEOUT = 60
+
+
+def celebrities():
+    """Авторы, чьи посты не раскладываются по лентам."""
+    ids = cache.get(CELEBRITIES_KEY)
+    if ids is None:
+        ids = set(AuthorStats.objects.filter(
+            is_celebrity=True
+        ).values_list('user_id', flat=True))
+        cache.set(CELEBRITIES_KEY, ids, CELEBRITIES_TIMEOUT)
+    return ids
+
+
+def refresh_celebrities(author_ids=None):
+    """Сверяет отметки знаменитостей с числом подписчиков.
+
+    Возвращает id авторов, переставших быть знаменитостями: их посты
+    нужно дополнить в ленты подписчиков через backfill_followers().
+    """
+    stats = AuthorStats.objects.all()
+    if author_ids is not None:
+        stats = stats.filter(user_id__in=author_ids)
+    demoted = list(stats.filter(
+        is_celebrity=True, followers_count__lte=TIMELINE_FANOUT_LIMIT
+    ).values_list('user_id', flat=True))
+    changed = stats.filter(
+        is_celebrity=False, followers_count__gt=TIMELINE_FANOUT_LIMIT
+    ).update(is_celebrity=True)
+    if demoted:
+        changed += AuthorStats.objects.filter(
+            user_id__in=demoted
+        ).update(is_celebrity=False)
+    if changed:
+        cache.delete(CELEBRITIES_KEY)
+    return demoted
+
+
+def _write(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out(post):
+    """Кладёт новый пост в ленты всех подписчиков автора."""
+    if post.author_id in celebrities():
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _write([
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    ])
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    if author_id in celebrities():
+        return
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('pk', 'pub_date')[:TIMELINE_BACKFILL_LIMIT]
+    _write([
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    ])
+
+
+def backfill_followers(author_id):
+    """Дополняет ленты всех подписчиков постами автора."""
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    for user_id in followers.iterator():
+        backfill(user_id, author_id)
+
+
+def remove(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild(user_id):
+    """Собирает ленту пользователя заново по таблице Follow."""
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        authors = Follow.objects.filter(
+            user_id=user_id
+        ).values_list('author_id', flat=True)
+        for author_id in authors:
+            backfill(user_id, author_id)
+
+
+def timeline(user):
+    """Посты ленты подписок пользователя."""
+    followed = celebrities()
+    if followed:
+        followed = list(Follow.objects.filter(
+            user=user, author_id__in=followed
+        ).values_list('author_id', flat=True))
+    if not followed:
+        # Сортировка по полям записи ленты читает индекс
+        # (user, -pub_date, -post) без сортировки в памяти.
+        return Post.objects.annotate(entry=FilteredRelation(
+            'timeline_entries', condition=Q(timeline_entries__user=user)
+        )).filter(entry__isnull=False).annotate(
+            entry_date=F('entry__pub_date'), entry_post=F('entry__post_id')
+        ).order_by('-entry_date', '-entry_post')
+    return Post.objects.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post'))
+        | Q(author_id__in=followed)
+    )
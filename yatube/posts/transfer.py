@@ -0,0 +1,251 @@
+"""Выгрузка и загрузка постов, комментариев и подписок.
+
+Данные лежат в каталоге по файлу на вид (posts, comments, follows) в
+NDJSON или CSV. Пользователи и группы записываются по username и slug
+и при загрузке создаются, если их нет. id постов и комментариев
+сохраняются, поэтому повторная загрузка той же пачки ничего не
+дублирует. После каждой пачки в каталог пишется контрольная точка:
+прерванная выгрузка или загрузка продолжается с неё.
+"""
+import csv
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from core.bulk import preserve_auto_now
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+CHECKPOINT = '.checkpoint.json'
+FORMATS = ('ndjson', 'csv')
+
+FIELDS = {
+    'posts': ('id', 'author', 'group', 'text', 'pub_date', 'image'),
+    'comments': ('id', 'post', 'author', 'text', 'created'),
+    'follows': ('id', 'user', 'author'),
+}
+COLUMNS = {
+    'posts': ('pk', 'author__username', 'group__slug', 'text', 'pub_date',
+              'image'),
+    'comments': ('pk', 'post_id', 'author__username', 'text', 'created'),
+    'follows': ('pk', 'user__username', 'author__username'),
+}
+MODELS = {'posts': Post, 'comments': Comment, 'follows': Follow}
+
+
+def data_path(directory, kind, data_format):
+    return os.path.join(directory, f'{kind}.{data_format}')
+
+
+class Checkpoint:
+    """Позиции в файлах, до которых работа уже сделана."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, CHECKPOINT)
+        self.state = {}
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                self.state = json.load(file)
+
+    def get(self, kind):
+        return self.state.get(kind)
+
+    def save(self, kind, **position):
+        self.state[kind] = position
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.state, file)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export(kind, directory, data_format, checkpoint):
+    """Дописывает в файл строки с id больше сохранённого. Число строк."""
+    path = data_path(directory, kind, data_format)
+    position = checkpoint.get(kind)
+    last_pk = 0
+    with open(path, 'a+', newline='', encoding='utf-8') as file:
+        if position:
+            # Всё, что записано после контрольной точки, пишется заново.
+            last_pk = position['pk']
+            file.truncate(position['offset'])
+        else:
+            file.truncate(0)
+        file.seek(0, os.SEEK_END)
+        if data_format == 'csv':
+            writer = csv.writer(file)
+            if not position:
+                writer.writerow(FIELDS[kind])
+        rows = MODELS[kind].objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list(*COLUMNS[kind]).iterator(chunk_size=BATCH_SIZE)
+        count = 0
+        for row in rows:
+            values = [_value(value) for value in row]
+            if data_format == 'csv':
+                writer.writerow(values)
+            else:
+                file.write(json.dumps(
+                    dict(zip(FIELDS[kind], values)), ensure_ascii=False
+                ) + '\n')
+            count += 1
+            if count % BATCH_SIZE == 0:
+                file.flush()
+                checkpoint.save(kind, pk=row[0], offset=file.tell())
+        file.flush()
+        if count:
+            checkpoint.save(kind, pk=row[0], offset=file.tell())
+    return count
+
+
+def read(path, data_format, offset):
+    """Записи файла с позицией после каждой: (запись, позиция)."""
+    with open(path, newline='', encoding='utf-8') as file:
+        if data_format == 'csv':
+            header = next(csv.reader([file.readline()]))
+        if offset:
+            file.seek(offset)
+        # readline, а не итерация по файлу: после неё работает tell().
+        lines = iter(file.readline, '')
+        if data_format == 'csv':
+            for row in csv.reader(lines):
+                yield dict(zip(header, row)), file.tell()
+        else:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line), file.tell()
+
+
+def _users(usernames):
+    """id пользователей по username, недостающие создаются."""
+    usernames = set(usernames)
+    found = dict(User.objects.filter(
+        username__in=usernames
+    ).values_list('username', 'pk'))
+    missing = usernames - set(found)
+    if missing:
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in missing],
+            ignore_conflicts=True,
+        )
+        found.update(User.objects.filter(
+            username__in=missing
+        ).values_list('username', 'pk'))
+    return found
+
+
+def _groups(slugs):
+    slugs = {slug for slug in slugs if slug}
+    found = dict(Group.objects.filter(
+        slug__in=slugs
+    ).values_list('slug', 'pk'))
+    missing = slugs - set(found)
+    if missing:
+        Group.objects.bulk_create(
+            [Group(title=slug, slug=slug) for slug in missing],
+            ignore_conflicts=True,
+        )
+        found.update(Group.objects.filter(
+            slug__in=missing
+        ).values_list('slug', 'pk'))
+    return found
+
+
+def build_posts(rows):
+    users = _users(row['author'] for row in rows)
+    groups = _groups(row['group'] for row in rows)
+    return [
+        Post(
+            id=int(row['id']),
+            author_id=users[row['author']],
+            group_id=groups.get(row['group']),
+            text=row['text'],
+            pub_date=parse_datetime(row['pub_date']),
+            image=row['image'] or '',
+        )
+        for row in rows
+    ]
+
+
+def build_comments(rows):
+    users = _users(row['author'] for row in rows)
+    post_ids = set(Post.objects.filter(
+        pk__in={int(row['post']) for row in rows}
+    ).values_list('pk', flat=True))
+    return [
+        Comment(
+            id=int(row['id']),
+            post_id=int(row['post']),
+            author_id=users[row['author']],
+            text=row['text'],
+            created=parse_datetime(row['created']),
+        )
+        for row in rows
+        if int(row['post']) in post_ids
+    ]
+
+
+def build_follows(rows):
+    users = _users(
+        name for row in rows for name in (row['user'], row['author'])
+    )
+    return [
+        Follow(user_id=users[row['user']], author_id=users[row['author']])
+        for row in rows
+        if row['user'] != row['author']
+    ]
+
+
+BUILDERS = {
+    'posts': build_posts,
+    'comments': build_comments,
+    'follows': build_follows,
+}
+
+
+def load(kind, directory, data_format, checkpoint):
+    """Загружает файл пачками с контрольной точки. Число строк."""
+    path = data_path(directory, kind, data_format)
+    if not os.path.exists(path):
+        return 0
+    position = checkpoint.get(kind)
+    offset = position['offset'] if position else 0
+    count = 0
+    batch = []
+
+    def flush(offset):
+        with transaction.atomic():
+            MODELS[kind].objects.bulk_create(
+                BUILDERS[kind](batch), ignore_conflicts=True
+            )
+        checkpoint.save(kind, offset=offset)
+        batch.clear()
+
+    with preserve_auto_now(Post, Comment):
+        for row, offset in read(path, data_format, offset):
+            batch.append(row)
+            count += 1
+            if len(batch) == BATCH_SIZE:
+                flush(offset)
+        if batch:
+            flush(offset)
+    return count
@@ -1,5 +1,5 @@
 from django.urls import path
-from posts import views
+from posts import api, feeds, views
 
 app_name = 'posts'
 
@@ -8,11 +8,17 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.post_search, name='post_search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
@@ -24,4 +30,18 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('group/<slug:slug>/feed/', feeds.group_feed, name='group_feed'),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.profile_feed,
+        name='profile_feed'
+    ),
+    path('follow/feed/<str:token>/', feeds.follow_feed, name='follow_feed'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_posts'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('api/follow/', api.follow_index, name='api_follow_index'),
+    path(
+        'api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'
+    ),
 ]
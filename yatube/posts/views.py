@@ -1,26 +1,45 @@
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
-
+from django.template.loader import render_to_string
+from django.utils.http import urlencode
+
+from core.replicas import pin, read_from_replica
+from yatube.settings import (COMMENTS_PER_PAGE, FEED_CACHE_TIMEOUT,
+                             POSTS_PER_PAGE)
+
+from . import follow_graph, search
+from .caching import versioned_cache_page
+from .counters import stats_for
+from .counts import post_count
+from .feeds import follow_feed_token
 from .forms import CommentForm, PostForm
 from .models import Comment, Follow, Group, Post, User
-from .pagination import paginator_context
+from .pagination import (CursorPaginator, elided_page_range,
+                         paginator_context)
+from .recommendations import suggestions_for
+from .timelines import timeline
 
 
-@cache_page(20, key_prefix='home_page')
+@versioned_cache_page(FEED_CACHE_TIMEOUT, 'posts')
+@read_from_replica
 def index(request):
     obj = paginator_context(
-        Post.objects.select_related('group').all(), request
+        Post.objects.for_feed(), request, count=post_count('posts')
     )
     context = {"page_obj": obj}
     return render(request, "posts/index.html", context)
 
 
+@versioned_cache_page(FEED_CACHE_TIMEOUT, 'group:{slug}')
+@read_from_replica
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     obj = paginator_context(
-        group.posts.all(),
-        request)
+        group.posts.for_feed(), request,
+        count=post_count(f'group:{slug}', group_id=group.pk)
+    )
     context = {
         "group": group,
         "page_obj": obj
@@ -28,18 +47,22 @@ def group_posts(request, slug):
     return render(request, "posts/group_list.html", context)
 
 
+@versioned_cache_page(FEED_CACHE_TIMEOUT, 'profile:{username}')
+@read_from_replica
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_count = author.posts.count()
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=author
-    ).exists()
+    stats = stats_for(author)
+    following = (
+        request.user.is_authenticated
+        and follow_graph.is_following(request.user.pk, author.pk)
+    )
     obj = paginator_context(
-        author.posts.all(),
-        request)
+        author.posts.for_feed(), request, count=stats.posts_count
+    )
     context = {
         "author": author,
-        "post_count": post_count,
+        "post_count": stats.posts_count,
+        "stats": stats,
         "following": following,
         "page_obj": obj
     }
@@ -47,10 +70,13 @@ def profile(request, username):
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id
+    )
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post_id=post_id)
-    posts_count = Post.objects.filter(author_id=post.author).count()
+    # Первая страница комментариев, остальные подгружает post_comments.
+    comments = comments_page(post_id, None)
+    posts_count = stats_for(post.author).posts_count
     context = {
         "post": post,
         "posts_count": posts_count,
@@ -60,6 +86,24 @@ def post_detail(request, post_id):
     return render(request, "posts/post_detail.html", context)
 
 
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = Paginator(search.search(query), POSTS_PER_PAGE).get_page(
+        request.GET.get('page')
+    )
+    page_obj.page_range = elided_page_range(page_obj)
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    context = {
+        "query": query,
+        "page_params": urlencode({'q': query}) + '&',
+        "page_obj": page_obj
+    }
+    return render(request, "posts/search.html", context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -96,6 +140,34 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+def comments_page(post_id, cursor):
+    return CursorPaginator(
+        Comment.objects.select_related('author').filter(post_id=post_id),
+        COMMENTS_PER_PAGE
+    ).page_after(cursor)
+
+
+def comment_data(request, comment):
+    return {
+        "id": comment.pk,
+        "author": comment.author.username,
+        "text": comment.text,
+        "created": comment.created.isoformat(),
+        "html": render_to_string(
+            'posts/includes/comment.html', {'comment': comment}, request
+        ),
+    }
+
+
+def post_comments(request, post_id):
+    get_object_or_404(Post.objects.only('pk'), id=post_id)
+    page = comments_page(post_id, request.GET.get('cursor'))
+    return JsonResponse({
+        "comments": [comment_data(request, comment) for comment in page],
+        "next_cursor": page.next_cursor,
+    })
+
+
 @login_required
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
@@ -105,16 +177,23 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post
         comment.save()
+        if request.is_ajax():
+            return JsonResponse(comment_data(request, comment), status=201)
+    elif request.is_ajax() and request.method == 'POST':
+        return JsonResponse({"errors": form.errors}, status=400)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
-    obj = paginator_context(Post.objects.select_related('author').filter(
-        author__following__user=request.user), request
+    obj = paginator_context(
+        timeline(request.user).for_feed(), request
     )
     context = {
-        'page_obj': obj
+        'page_obj': obj,
+        'feed_token': follow_feed_token(request.user),
+        'suggestions': suggestions_for(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -122,8 +201,12 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     post_author = get_object_or_404(User, username=username)
-    if request.user != post_author:
+    if request.user != post_author and not follow_graph.is_following(
+        request.user.pk, post_author.pk
+    ):
         Follow.objects.get_or_create(user=request.user, author=post_author)
+    # Подписка приходит GET-запросом, ReplicaPinMiddleware её не видит.
+    pin(request)
     return redirect('posts:profile', username=username)
 
 
@@ -134,4 +217,5 @@ def profile_unfollow(request, username):
         user=request.user,
         author=post_author
     ).delete()
+    pin(request)
     return redirect('posts:profile', username=username)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,13 +50,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -78,6 +82,22 @@ TEMPLATES = [
     },
 ]
 
+# YATUBE_TEMPLATES=production: разобранные шаблоны кэшируются в
+# процессе, статичные include встраиваются в исходник, а wsgi.py
+# разбирает все шаблоны при старте. Правки шаблонов видны после
+# перезапуска.
+TEMPLATE_MODE = os.environ.get('YATUBE_TEMPLATES', 'debug')
+if TEMPLATE_MODE == 'production':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            ('core.template_loaders.InliningLoader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
@@ -90,7 +110,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами, PRAGMA не выполняются заново.
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_DB_CONN_MAX_AGE', 60)),
+    }
+}
+
+# Реплика для чтения лент: YATUBE_DB_REPLICA — путь к копии базы,
+# которую обновляет команда sync_replica. Интервал обновления должен
+# быть меньше REPLICA_PIN_SECONDS.
+READ_REPLICA = None
+if os.environ.get('YATUBE_DB_REPLICA'):
+    READ_REPLICA = 'replica'
+    DATABASES[READ_REPLICA] = {
+        **DATABASES['default'],
+        'NAME': os.environ['YATUBE_DB_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 10
+
+# Выполняются для каждого нового соединения с SQLite, см. core.sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 20000,
+    'temp_store': 'MEMORY',
 }
 
 
@@ -147,8 +196,72 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 POSTS_PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
+
+CURSOR_FROM_PAGE = 5
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Страницы, которые анонимы получают из кэша целиком, и пространства
+# имён posts.caching, версии которых входят в ключ страницы.
+PAGE_CACHE_VIEWS = {
+    'posts:home_page': ['posts'],
+    'posts:group_posts': ['group:{slug}'],
+    'posts:profile': ['profile:{username}'],
+    'posts:post_detail': ['posts', 'post:{post_id}'],
+}
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Сколько ещё секунд истёкшая страница отдаётся, пока её перерисовывают.
+PAGE_CACHE_STALE = 60
+
+# Сколько запрос ждёт страницу, которую уже рендерит другой, секунд.
+PAGE_CACHE_WAIT = 5
+
+# Как часто пересчитывается число постов на главной и в группах, секунд.
+POST_COUNT_REFRESH = 60
+
+TIMELINE_FANOUT_LIMIT = 10000
+
+TIMELINE_BACKFILL_LIMIT = 1000
+
+# Сколько авторов recommend_follows сохраняет каждому пользователю.
+SUGGESTIONS_PER_USER = 10
+
+# Посты с большим числом комментаторов не связывают их в кандидатов.
+SUGGESTIONS_MAX_COMMENTERS = 200
+
+# Фоновые задачи core.jobs выполняет воркер run_jobs и в разработке, и на
+# сервере. Сразу в вызывающем потоке они выполняются только в тестах:
+# TestCase не коммитит транзакцию, и on_commit не сработал бы.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+JOBS_EAGER = os.environ.get(
+    'YATUBE_JOBS_EAGER', '1' if TESTING else '0'
+) == '1'
+
+REQUEST_TIMING = os.environ.get('YATUBE_REQUEST_TIMING') == '1'
+
+REQUEST_TIMING_WINDOW = 1000
+
+REQUEST_TIMING_SLOWEST = 5
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Общий для всех воркеров кэш в /dev/shm: YATUBE_CACHE=shared. Без
+# YATUBE_CACHE_LOCATION файл лежит в личном каталоге /dev/shm/yatube-<uid>.
+if os.environ.get('YATUBE_CACHE') == 'shared':
+    CACHES['default'] = {
+        'BACKEND': 'core.cache.SharedCache',
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_SIZE': int(
+                os.environ.get('YATUBE_CACHE_MAX_SIZE', 64 * 1024 * 1024)
+            ),
+            'MAX_ENTRIES': 100000,
+        },
+    }